@@ -2,6 +2,7 @@
 ASGI config for analysis_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Task event streams are answered here, every other request by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -12,7 +13,26 @@ import os
 
 # Third-Party Libraries
 from django.core.asgi import get_asgi_application
+from django.urls import Resolver404, resolve
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings.base")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Project Imports
+from apps.apis.events import task_events  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["method"] == "GET":
+        path, root_path = scope["path"], scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        try:
+            match = resolve(path)
+        except Resolver404:
+            match = None
+        # a long-lived stream, see apps.apis.events
+        if match is not None and match.view_name == "apis:task-events":
+            return await task_events(scope, receive, send, match.kwargs["pk"])
+    return await django_application(scope, receive, send)
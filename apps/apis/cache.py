@@ -0,0 +1,79 @@
+# Standard Library
+import hashlib
+import json
+from datetime import timedelta
+
+# Third-Party Libraries
+from django.utils import timezone
+
+# Project Imports
+from models.task import Result
+from settings.base import env
+
+# params that change how a task runs but not what it computes
+EXECUTION_PARAMS = {"task_id", "n_jobs", "cache", "columnar"}
+
+
+def file_digest(file, chunk_size=1024 * 1024):
+    """sha256 of a stored file, read chunk by chunk."""
+    sha256 = hashlib.sha256()
+    file.open("rb")
+    try:
+        for chunk in file.chunks(chunk_size):
+            sha256.update(chunk)
+    finally:
+        file.close()
+    return sha256.hexdigest()
+
+
+def attachment_digest(attachment):
+    """Content digest of an attachment, computed once and kept on it.
+
+    Reads the whole file, only called in the worker: by the ingest stage or
+    the first task run on the attachment.
+    """
+    if attachment.digest is None:
+        attachment.digest = file_digest(attachment.file)
+        attachment.save(update_fields=["digest"])
+    return attachment.digest
+
+
+def cache_key(task):
+    params = {
+        key: value
+        for key, value in task.params.items()
+        if key not in EXECUTION_PARAMS
+    }
+    canonical = json.dumps(
+        [attachment_digest(task.attachment), task.category, params],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_cacheable(task):
+    # non-deterministic runs opt out with params["cache"] = false
+    if env.int("RESULT_CACHE_TTL", default=86400) <= 0:
+        return False
+    return task.attachment is not None and task.params.get("cache", True)
+
+
+def cached_result(task):
+    """The newest result of an identical task within the cache TTL.
+
+    Looked up from the web request, so only once the attachment's digest is
+    known: hashing an upload of many GB there would hold up the request.
+    """
+    if not is_cacheable(task) or task.attachment.digest is None:
+        return None
+    ttl = timedelta(seconds=env.int("RESULT_CACHE_TTL", default=86400))
+    return (
+        Result.objects.filter(
+            cache_key=cache_key(task),
+            created_at__gte=timezone.now() - ttl,
+        )
+        .order_by("-created_at")
+        .first()
+    )
@@ -0,0 +1,237 @@
+# Standard Library
+import mimetypes
+import os
+import re
+import tempfile
+
+# Third-Party Libraries
+from django.core.files.base import File
+from django.http import (
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+
+# Project Imports
+from forecasters.results import compressed_stream
+from settings.base import env
+from .cache import file_digest
+
+# precompressed copies stored next to a result file, in order of preference
+SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def variants():
+    return [
+        encoding
+        for encoding in env.list("RESULT_VARIANTS", default=list(SUFFIXES))
+        if encoding in SUFFIXES
+    ]
+
+
+def compressible(name):
+    # compressed and parquet results gain nothing from another pass
+    return name.endswith(".csv")
+
+
+def store_variants(file, chunk_size=1024 * 1024):
+    """Store a compressed copy of ``file`` per encoding in RESULT_VARIANTS,
+    named like the file plus the encoding's suffix."""
+    if not compressible(file.name):
+        return
+    for encoding in variants():
+        with tempfile.TemporaryFile() as buffer:
+            stream = compressed_stream(buffer, encoding)
+            file.open("rb")
+            try:
+                for chunk in file.chunks(chunk_size):
+                    stream.write(chunk)
+            finally:
+                file.close()
+            stream.close()
+            buffer.seek(0)
+            name = file.name + SUFFIXES[encoding]
+            # keep the name, the storage would pick another one
+            if file.storage.exists(name):
+                file.storage.delete(name)
+            file.storage.save(name, File(buffer))
+
+
+def result_digest(result):
+    """Content digest of a result file, computed once in the worker and
+    kept on it."""
+    if result.digest is None:
+        result.digest = file_digest(result.file)
+        result.save(update_fields=["digest"])
+    return result.digest
+
+
+def precompress(result):
+    """Prepare a new result for download, in the worker."""
+    if result.file:
+        store_variants(result.file)
+        result_digest(result)
+
+
+def accepted_encodings(header):
+    """Content codings of an ``Accept-Encoding`` header with a q above 0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, *params = part.strip().split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate(request, file):
+    """The encoding and stored name of the variant to send, (None, name)
+    for the file itself."""
+    accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    if compressible(file.name):
+        for encoding in variants():
+            name = file.name + SUFFIXES[encoding]
+            if encoding in accepted and file.storage.exists(name):
+                return encoding, name
+    return None, file.name
+
+
+def byte_range(header, size):
+    """(start, stop) of a single byte range, None to send the whole file.
+
+    Raises ValueError when the range starts past the end of the file.
+    """
+    match = RANGE.match(header.strip())
+    # several ranges are answered with the whole file
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # the last bytes of the file
+        if int(last) == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - int(last)), size
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range starts past the end of the file")
+    return start, min(int(last) + 1, size) if last else size
+
+
+def iter_range(file, start, stop, chunk_size=64 * 1024):
+    try:
+        file.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def opaque(etag):
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header, etag):
+    tags = [tag.strip() for tag in header.split(",")]
+    # weak comparison, a variant's bytes only change with the result
+    return "*" in tags or opaque(etag) in {opaque(tag) for tag in tags}
+
+
+def result_etag(result, name, encoding=None):
+    """ETag of the stored file ``name`` sent for a result.
+
+    Keyed on the digest the worker kept on the result, results without
+    one get a weak tag from the size and mtime of the file: the web
+    request never reads the file through to hash it.
+    """
+    if result.digest is not None:
+        if encoding is not None:
+            return f'"{result.digest}-{encoding}"'
+        return f'"{result.digest}"'
+    storage = result.file.storage
+    size = storage.size(name)
+    mtime = int(storage.get_modified_time(name).timestamp())
+    return f'W/"{size:x}-{mtime:x}"'
+
+
+def result_response(request, result):
+    """Download response for a result file.
+
+    Sends a precompressed variant when the client accepts its encoding,
+    answers If-None-Match with 304 and a single byte Range with 206, all
+    keyed on result_etag. With RESULT_SENDFILE set to "x-accel-redirect"
+    or "x-sendfile" only the headers are sent, the front server sends the
+    file itself.
+    """
+    file = result.file
+    encoding, name = negotiate(request, file)
+    etag = result_etag(result, name, encoding)
+    headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+    if compressible(file.name) and variants():
+        headers["Vary"] = "Accept-Encoding"
+    if etag_matches(request.META.get("HTTP_IF_NONE_MATCH", ""), etag):
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    filename = os.path.basename(file.name)
+    content_type, file_encoding = mimetypes.guess_type(filename)
+    if file_encoding is not None or content_type is None:
+        # a result written compressed is sent as the archive it is
+        content_type = "application/octet-stream"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    sendfile = env("RESULT_SENDFILE", default="")
+    if sendfile in ("x-accel-redirect", "x-sendfile"):
+        response = HttpResponse(content_type=content_type)
+        if sendfile == "x-accel-redirect":
+            prefix = env("RESULT_SENDFILE_PREFIX", default="/protected/")
+            response["X-Accel-Redirect"] = prefix + name
+        else:
+            response["X-Sendfile"] = file.storage.path(name)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    size = file.storage.size(name)
+    span = None
+    range_header = request.META.get("HTTP_RANGE", "")
+    if_range = request.META.get("HTTP_IF_RANGE", "")
+    # If-Range takes a strong ETag only
+    strong = not etag.startswith("W/")
+    if range_header and (not if_range or strong and if_range.strip() == etag):
+        try:
+            span = byte_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+    start, stop = span or (0, size)
+    response = StreamingHttpResponse(
+        iter_range(file.storage.open(name, "rb"), start, stop),
+        status=206 if span else 200,
+        content_type=content_type,
+    )
+    for header, value in headers.items():
+        response[header] = value
+    response["Content-Length"] = str(stop - start)
+    if span:
+        response["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    return response
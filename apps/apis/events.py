@@ -0,0 +1,288 @@
+# Standard Library
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+# Third-Party Libraries
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from kombu import Consumer, Exchange, Queue
+from kombu.exceptions import KombuError
+from rest_framework.renderers import BaseRenderer
+
+# Project Imports
+from models.task import Task
+from settings.base import env
+
+logger = logging.getLogger(__name__)
+
+# events of a task are published with its uid as the routing key, nothing is
+# stored: a message no stream is waiting for is dropped by the broker
+EXCHANGE = Exchange(
+    "task-events", type="topic", durable=False, delivery_mode="transient"
+)
+PROCESSING, SUCCESS, FAILED = "processing", "success", "failed"
+STATUSES = {
+    str(Task.PROCESSING[0]): PROCESSING,
+    str(Task.SUCCESS[0]): SUCCESS,
+    str(Task.FAILED[0]): FAILED,
+}
+FINISHED = (SUCCESS, FAILED)
+# ms an EventSource waits before it reconnects
+RETRY = 5000
+
+
+def publish(uid, status, **data):
+    """Publish an event of a task, from the worker.
+
+    A broker out of reach only loses the event, the task goes on and
+    streams still see its status in the database.
+    """
+    # Project Imports
+    from celery_main import app
+
+    if uid is None:
+        return
+    body = {"uid": uid, "status": status, **data}
+    try:
+        with app.producer_or_acquire() as producer:
+            producer.publish(
+                body,
+                exchange=EXCHANGE,
+                routing_key=uid,
+                declare=[EXCHANGE],
+                serializer="json",
+            )
+    except (OSError, KombuError) as e:
+        logger.warning("Task event %s of %s not published: %s", status, uid, e)
+
+
+def format_event(body):
+    """A server-sent event named after the status of the task."""
+    return f"event: {body['status']}\ndata: {json.dumps(body)}\n\n"
+
+
+def task_event(task):
+    """The event telling the current status of a task."""
+    status = STATUSES.get(str(task.status), PROCESSING)
+    body = {"uid": task.uid, "status": status}
+    if status == SUCCESS:
+        body["progress"] = 1
+    return body
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Sends server-sent events, rendered by format_event."""
+
+    media_type = "text/event-stream"
+    format = "event-stream"  # noqa: A003
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        # errors stay readable
+        return json.dumps(data).encode("utf-8")
+
+
+class EventHub:
+    """One broker consumer per server process, handing the events of the
+    exchange to the streams waiting on their task.
+
+    The consumer runs in a thread of its own with a queue bound to every
+    task, so a stream only registers with the hub and opens no connection.
+    """
+
+    def __init__(self):
+        self.streams = defaultdict(set)
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="task-events", daemon=True
+                )
+                self.thread.start()
+
+    def subscribe(self, uid):
+        """An asyncio queue receiving the events of a task, on the running
+        loop."""
+        self.start()
+        stream = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.lock:
+            self.streams[uid].add(stream)
+        return stream[1]
+
+    def unsubscribe(self, uid, queue):
+        with self.lock:
+            streams = self.streams.get(uid, set())
+            streams -= {stream for stream in streams if stream[1] is queue}
+            if not streams:
+                self.streams.pop(uid, None)
+
+    def dispatch(self, body, message=None):
+        with self.lock:
+            streams = list(self.streams.get(body.get("uid", None), ()))
+        for loop, queue in streams:
+            loop.call_soon_threadsafe(queue.put_nowait, body)
+
+    def consume(self, connection):
+        queue = Queue(
+            f"task-events.{uuid.uuid4().hex}",
+            exchange=EXCHANGE,
+            routing_key="#",
+            durable=False,
+            exclusive=True,
+            auto_delete=True,
+        )
+        with Consumer(
+            connection,
+            [queue],
+            callbacks=[self.dispatch],
+            accept=["json"],
+            no_ack=True,
+        ):
+            self.ready.set()
+            while True:
+                try:
+                    connection.drain_events(timeout=1)
+                except socket.timeout:
+                    connection.heartbeat_check()
+
+    def run(self):
+        # Project Imports
+        from celery_main import app
+
+        while True:
+            try:
+                with app.connection_for_read() as connection:
+                    self.consume(connection)
+            except (OSError, KombuError) as e:
+                self.ready.clear()
+                logger.warning("Task events consumer lost the broker: %s", e)
+                time.sleep(env.int("EVENTS_RECONNECT", default=5))
+
+
+hub = EventHub()
+
+
+def task_status(uid):
+    """The current event of a task, None when there is no such task."""
+    close_old_connections()
+    try:
+        task = Task.objects.filter(uid=uid).first()
+        return None if task is None else task_event(task)
+    finally:
+        close_old_connections()
+
+
+async def disconnected(receive):
+    # the request body comes first
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def send_event(send, body):
+    await send(
+        {
+            "type": "http.response.body",
+            "body": format_event(body).encode("utf-8"),
+            "more_body": True,
+        }
+    )
+
+
+async def task_events(scope, receive, send, uid):
+    """ASGI application streaming the events of a task until it finishes.
+
+    The status in the database is sent first, then events as the worker
+    publishes them. Each EVENTS_HEARTBEAT seconds without an event the
+    status is read again, which covers events lost while the hub was away
+    from the broker.
+    """
+    queue = hub.subscribe(uid)
+    try:
+        # wait for the hub's queue, so no event falls between the status
+        # read and the subscription
+        await asyncio.get_running_loop().run_in_executor(
+            None, hub.ready.wait, env.float("EVENTS_READY_TIMEOUT", default=5)
+        )
+        body = await sync_to_async(task_status)(uid)
+        if body is None:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 404,
+                    "headers": [(b"content-type", b"application/json")],
+                }
+            )
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b'{"error": "Task not found."}',
+                }
+            )
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    # nginx would buffer the stream
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": f"retry: {RETRY}\n\n".encode("utf-8"),
+                "more_body": True,
+            }
+        )
+        await send_event(send, body)
+        heartbeat = env.float("EVENTS_HEARTBEAT", default=15)
+        disconnect = asyncio.ensure_future(disconnected(receive))
+        try:
+            while body["status"] not in FINISHED:
+                event = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {event, disconnect},
+                    timeout=heartbeat,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnect in done:
+                    event.cancel()
+                    return
+                if event in done:
+                    body = event.result()
+                    await send_event(send, body)
+                    continue
+                event.cancel()
+                body = await sync_to_async(task_status)(uid) or body
+                if body["status"] in FINISHED:
+                    await send_event(send, body)
+                else:
+                    # keeps proxies from closing an idle stream
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": b": heartbeat\n\n",
+                            "more_body": True,
+                        }
+                    )
+        finally:
+            disconnect.cancel()
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        hub.unsubscribe(uid, queue)
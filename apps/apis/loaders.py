@@ -0,0 +1,305 @@
+# Standard Library
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+# Third-Party Libraries
+import numpy as np
+import pandas as pd
+from django.core.files.base import File
+
+# Project Imports
+from apps.apis.cache import file_digest
+from settings.base import env
+
+logger = logging.getLogger(__name__)
+
+
+def widest(dtype, other):
+    """A dtype holding the values of both, object when they do not mix."""
+    if dtype == other:
+        return dtype
+    try:
+        return str(np.promote_types(dtype, other))
+    except TypeError:
+        return "object"
+
+
+def arrow_schema(dtypes):
+    """Arrow schema of a frame's ``{column: dtype}``, strings for objects."""
+    # Third-Party Libraries
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field(
+                column,
+                pa.string()
+                if dtype == "object"
+                else pa.from_numpy_dtype(np.dtype(dtype)),
+            )
+            for column, dtype in dtypes.items()
+        ]
+    )
+
+
+def required_columns(params):
+    """Columns a task reads, or None when it needs every column.
+
+    ``usecols`` lists them explicitly, otherwise a task that names its
+    ``features`` only needs those plus its target, dummies and excludes.
+    Excluded columns are not modelled but are carried into the result file.
+    The ``group_by`` column splitting grouped forecasts is always read.
+    """
+    group_by = params.get("group_by", None)
+    if usecols := params.get("usecols", None):
+        columns = list(usecols)
+    elif features := params.get("features", None):
+        columns = list(features)
+        columns.extend(params.get("dummies", None) or [])
+        columns.extend(params.get("excludes", None) or [])
+        if target := params.get("target", None):
+            columns.append(target)
+    else:
+        return None
+    if group_by:
+        columns.append(group_by)
+    return list(dict.fromkeys(columns))
+
+
+def dtype_hints(params, columns=None):
+    """Per-column dtypes requested in ``params["dtypes"]``, e.g.
+    ``{"store": "category", "sales": "float32"}``."""
+    hints = params.get("dtypes", None) or {}
+    return {
+        column: dtype
+        for column, dtype in hints.items()
+        if columns is None or column in columns
+    }
+
+
+def downcast(data, skip=()):
+    """Shrink numeric columns to the smallest dtype holding their values."""
+    for column in data.select_dtypes("integer").columns.difference(skip):
+        data[column] = pd.to_numeric(data[column], downcast="integer")
+    for column in data.select_dtypes("floating").columns.difference(skip):
+        data[column] = pd.to_numeric(data[column], downcast="float")
+    return data
+
+
+class ChunkReader:
+    """Re-iterable reader yielding projected, downcast chunks of a CSV or
+    Parquet file, so a file is never held in memory as a whole."""
+
+    def __init__(self, path, columns=None, chunksize=100000, dtype=None):
+        self.path = str(path)
+        self.columns = columns
+        self.chunksize = chunksize
+        self.dtype = dtype or {}
+
+    def __iter__(self):
+        if self.path.endswith(".parquet"):
+            # Third-Party Libraries
+            import pyarrow.parquet as pq
+
+            batches = pq.ParquetFile(self.path).iter_batches(
+                batch_size=self.chunksize, columns=self.columns
+            )
+            chunks = (
+                batch.to_pandas().astype(self.dtype) for batch in batches
+            )
+        else:
+            chunks = pd.read_csv(
+                self.path,
+                usecols=self.columns,
+                dtype=self.dtype,
+                chunksize=self.chunksize,
+            )
+        for chunk in chunks:
+            yield downcast(chunk, skip=list(self.dtype))
+
+
+class AttachmentLoader:
+    """Load an attachment into a DataFrame.
+
+    Attachments converted by the ingest stage are read from their stored
+    Parquet copy. Otherwise a task's columns are parsed from the raw
+    CSV/XLSX file; the first load of all columns stores a Parquet copy keyed
+    on the sha256 of the file content, later loads of the same content read
+    the columnar copy instead of parsing the raw file again.
+    """
+
+    chunk_size = 1024 * 1024
+    readers = {
+        "csv": pd.read_csv,
+        "xlsx": pd.read_excel,
+    }
+
+    def __init__(self, attachment):
+        self.attachment = attachment
+        self.file_format = attachment.file_format
+        self.cache_dir = Path(
+            env("ATTACHMENT_CACHE_DIR", default="cache/attachments")
+        )
+        self._digest = attachment.digest
+        self.parsed = None
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = file_digest(self.attachment.file, self.chunk_size)
+        return self._digest
+
+    @property
+    def cache_path(self):
+        return self.cache_dir / f"{self.digest}.parquet"
+
+    def chunks(self, params):  # sourcery skip: raise-specific-error
+        path = (
+            self.attachment.columnar_file.path
+            if self.attachment.columnar_file
+            else self.attachment.file.path
+        )
+        if not path.endswith((".csv", ".parquet")):
+            raise Exception("Streaming is only supported for csv files")
+        columns = required_columns(params)
+        return ChunkReader(
+            path,
+            columns=columns,
+            chunksize=params.get("chunksize", 100000),
+            dtype=dtype_hints(params, columns),
+        )
+
+    def load(self, params=None):
+        params = params or {}
+        if params.get("streaming", False):
+            # only the projected, downcast frame is ever materialized
+            return pd.concat(self.chunks(params), ignore_index=True)
+        columns = required_columns(params)
+        hints = dtype_hints(params, columns)
+        if self.attachment.columnar_file:
+            data = pd.read_parquet(
+                self.attachment.columnar_file.path, columns=columns
+            )
+        elif self.cache_path.exists():
+            data = pd.read_parquet(self.cache_path, columns=columns)
+        else:
+            # only the task's columns are parsed, with their hints; a full
+            # copy for other projections is kept by the ingest stage
+            data = self.parse(usecols=columns, dtype=hints or None)
+            if columns is None and not hints:
+                self.store(data)
+            if columns is not None:
+                # in the order the task asks for, not the file's
+                data = data[columns]
+            return data
+        if hints:
+            data = data.astype(hints)
+        return data
+
+    def parse(self, **options):  # sourcery skip: raise-specific-error
+        if self.file_format not in self.readers:
+            raise Exception("File format not supported")
+        return self.readers[self.file_format](
+            self.attachment.file.path, **options
+        )
+
+    def parse_chunks(self, chunksize=100000):
+        """Chunks of the attachment. A csv file is read again on each call,
+        spreadsheets are bounded in size, cannot be read in parts and are
+        parsed once."""
+        if self.file_format == "csv":
+            return pd.read_csv(self.attachment.file.path, chunksize=chunksize)
+        if self.parsed is None:
+            self.parsed = self.parse()
+        return [self.parsed]
+
+    def store(self, data):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # write to a private file first so concurrent workers never read a
+        # half-written cache entry
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            data.to_parquet(tmp_path)
+        except (ImportError, TypeError, ValueError) as e:
+            # e.g. pyarrow missing or mixed-type object columns
+            logger.warning("Attachment %s not cached: %s", self.digest, e)
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return
+        os.replace(tmp_path, self.cache_path)
+
+    def ingest(self, chunksize=100000):
+        """Parse the attachment chunk by chunk into a typed Parquet copy kept
+        on the model, recording its schema on the way.
+
+        Only one chunk is held in memory. A first pass merges the schema of
+        the chunks, the second writes them with the merged types to a
+        temporary file that is handed to the storage from disk.
+        """
+        schema = None
+        for chunk in self.parse_chunks(chunksize):
+            schema = self.schema(chunk, schema)
+        self.attachment.digest = self.digest
+        self.attachment.schema = schema or {}
+        with tempfile.TemporaryFile() as buffer:
+            try:
+                self.convert(buffer, schema, chunksize)
+            except (
+                ImportError,
+                NotImplementedError,
+                TypeError,
+                ValueError,
+            ) as e:
+                # e.g. pyarrow missing or mixed-type object columns
+                logger.warning(
+                    "Attachment %s not converted: %s", self.digest, e
+                )
+            else:
+                buffer.seek(0)
+                self.attachment.columnar_file.save(
+                    f"{self.digest}.parquet", File(buffer), save=False
+                )
+            self.attachment.save()
+        return self.attachment
+
+    def convert(self, file, schema, chunksize=100000):
+        """Write the chunks to ``file`` as Parquet, with the types of the
+        ``schema`` merged over all of them."""
+        # Third-Party Libraries
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = arrow_schema(schema["dtypes"])
+        with pq.ParquetWriter(file, types) as writer:
+            for chunk in self.parse_chunks(chunksize):
+                writer.write_table(
+                    pa.Table.from_pandas(
+                        chunk, schema=types, preserve_index=False
+                    )
+                )
+
+    @staticmethod
+    def schema(data, schema=None):
+        """Schema of a frame, merged into the ``schema`` of the chunks read
+        before it."""
+        dtypes = {
+            str(column): str(dtype) for column, dtype in data.dtypes.items()
+        }
+        nulls = {
+            str(column): int(count)
+            for column, count in data.isna().sum().items()
+        }
+        if schema is None:
+            return {
+                "columns": list(dtypes),
+                "dtypes": dtypes,
+                "rows": len(data),
+                "nulls": nulls,
+            }
+        for column, dtype in dtypes.items():
+            schema["dtypes"][column] = widest(schema["dtypes"][column], dtype)
+            schema["nulls"][column] += nulls[column]
+        schema["rows"] += len(data)
+        return schema
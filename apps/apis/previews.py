@@ -0,0 +1,145 @@
+# Standard Library
+import json
+import math
+
+# Third-Party Libraries
+from rest_framework.renderers import BaseRenderer
+
+# result files written compressed, see forecasters.results
+ENCODINGS = {".gz": "gzip", ".zst": "zstd"}
+
+
+class ArrowStreamRenderer(BaseRenderer):
+    """Sends a preview page as an Arrow IPC stream, ``?format=arrow``."""
+
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"  # noqa: A003
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        # errors stay readable
+        return json.dumps(data).encode("utf-8")
+
+
+def columnar_source(result):
+    """The stored Parquet file holding a result's rows, if there is one."""
+    if result.columnar_file:
+        return result.columnar_file
+    if result.file.name.endswith(".parquet"):
+        return result.file
+    return None
+
+
+def open_parquet(file):
+    # Third-Party Libraries
+    import pyarrow.parquet as pq
+
+    try:
+        path = file.path
+    except NotImplementedError:
+        # a storage without local files
+        file.open("rb")
+        return pq.ParquetFile(file.file)
+    return pq.ParquetFile(path, memory_map=True)
+
+
+def read_parquet_page(file, offset, limit, columns=None):
+    """Only the row groups overlapping the page are read."""
+    parquet = open_parquet(file)
+    names = parquet.schema_arrow.names
+    if missing := [column for column in columns or [] if column not in names]:
+        raise KeyError(f"Unknown columns {missing}")
+    metadata = parquet.metadata
+    groups, first, start = [], None, 0
+    for index in range(parquet.num_row_groups):
+        rows = metadata.row_group(index).num_rows
+        if start + rows > offset and start < offset + limit:
+            first = start if first is None else first
+            groups.append(index)
+        start += rows
+    if not groups:
+        table = parquet.schema_arrow.empty_table()
+        return table.select(columns or table.column_names), metadata.num_rows
+    table = parquet.read_row_groups(groups, columns=columns)
+    return table.slice(offset - first, limit), metadata.num_rows
+
+
+def read_csv_rows(file, **options):
+    # Third-Party Libraries
+    import pandas as pd
+    import pyarrow as pa
+
+    encoding = next(
+        (
+            encoding
+            for suffix, encoding in ENCODINGS.items()
+            if file.name.endswith(suffix)
+        ),
+        None,
+    )
+    file.open("rb")
+    try:
+        source = file.file
+        if encoding is not None:
+            source = pa.input_stream(source, compression=encoding)
+        return pd.read_csv(source, **options)
+    finally:
+        file.close()
+
+
+def read_csv_page(file, offset, limit, columns=None):
+    """Fallback for results without a Parquet copy, parses the lines up
+    to the end of the page. The total is unknown."""
+    # Third-Party Libraries
+    import pyarrow as pa
+
+    if columns:
+        header = read_csv_rows(file, nrows=0).columns
+        if missing := [column for column in columns if column not in header]:
+            raise KeyError(f"Unknown columns {missing}")
+    data = read_csv_rows(
+        file,
+        skiprows=range(1, offset + 1),
+        nrows=limit,
+        usecols=columns,
+    )
+    return pa.Table.from_pandas(data, preserve_index=False), None
+
+
+def read_page(result, offset, limit, columns=None):
+    """``limit`` rows of a result from ``offset`` as an Arrow table, and
+    the number of rows in the result when known.
+
+    Raises KeyError for a column the result does not have.
+    """
+    source = columnar_source(result)
+    if source is None:
+        return read_csv_page(result.file, offset, limit, columns)
+    return read_parquet_page(source, offset, limit, columns)
+
+
+def to_records(table):
+    """Rows of a table for JSON, NaN and infinities as null."""
+    return [
+        {
+            name: (
+                None
+                if isinstance(value, float) and not math.isfinite(value)
+                else value
+            )
+            for name, value in row.items()
+        }
+        for row in table.to_pylist()
+    ]
+
+
+def to_arrow_stream(table):
+    # Third-Party Libraries
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
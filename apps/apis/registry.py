@@ -0,0 +1,38 @@
+# Standard Library
+import threading
+from collections import OrderedDict
+
+# Project Imports
+from settings.base import env
+
+
+class ModelRegistry:
+    """Fitted models persisted with their results, kept deserialized in an
+    in-process LRU so hot models are scored without touching storage."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.models = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, result):
+        key = result.model_file.name
+        with self.lock:
+            if key in self.models:
+                self.models.move_to_end(key)
+                return self.models[key]
+        # unpickling imports the model's libraries, the web tier only pays
+        # for them once a model is scored
+        # Third-Party Libraries
+        import joblib
+
+        with result.model_file.open("rb") as file:
+            model = joblib.load(file)
+        with self.lock:
+            self.models[key] = model
+            while len(self.models) > self.maxsize:
+                self.models.popitem(last=False)
+        return model
+
+
+registry = ModelRegistry(env.int("MODEL_CACHE_SIZE", default=16))
@@ -0,0 +1,95 @@
+# Project Imports
+from forecasters import methods
+from settings.base import env
+
+# fast: light methods on small and medium data, many at once per worker
+# heavy: long fits, sweeps and large data, one at a time
+# dl: TensorFlow on CPU, a worker of its own so a fit gets all the cores
+FAST, HEAVY, DL = "fast", "heavy", "dl"
+QUEUES = (FAST, HEAVY, DL)
+
+CATEGORY_METHODS = {
+    0: methods.TIME_SERIES,
+    1: methods.CLASSIFICATION,
+    2: methods.CLUSTERING,
+    3: methods.SENTIMENT_ANALYSIS,
+}
+
+# used when an attachment has not been ingested yet, see estimate_rows
+BYTES_PER_ROW = 100
+
+
+def estimate_rows(attachment):
+    """Rows recorded by the ingest stage, or a guess from the file size."""
+    if rows := attachment.schema.get("rows", None):
+        return rows
+    try:
+        return attachment.size // BYTES_PER_ROW
+    except (OSError, ValueError):
+        return 0
+
+
+def task_queue(task):
+    """The queue a task is sent to, by its method's cost and data size.
+
+    Each of the method's cost ("light", "medium", "heavy"), an attachment
+    larger than ROUTING_LARGE_ROWS rows and a sweep count towards the
+    heavy queue, two steps or more send it there.
+    """
+    registry = CATEGORY_METHODS.get(task.category, None)
+    try:
+        method = registry.get(task.params.get("method", None))
+    except (AttributeError, KeyError):
+        # fails fast in the worker
+        return FAST
+    if method.library == "tensorflow":
+        return DL
+    steps = methods.COSTS.index(method.cost)
+    large_rows = env.int("ROUTING_LARGE_ROWS", default=1000000)
+    if task.attachment is not None and (
+        estimate_rows(task.attachment) > large_rows
+    ):
+        steps += 1
+    if task.params.get("sweep", None):
+        steps += 1
+    return HEAVY if steps >= 2 else FAST
+
+
+def task_options(task):
+    """Options of ``execute.apply_async`` for a task: its queue, and for the
+    heavy queue the HEAVY_SOFT_TIME_LIMIT seconds after which the task is
+    failed, with HEAVY_TIME_LIMIT_GRACE more before the worker process is
+    killed. A limit of 0 disables them, only the prefork pool enforces them.
+    """
+    queue = task_queue(task)
+    options = {"queue": queue}
+    soft_time_limit = env.int("HEAVY_SOFT_TIME_LIMIT", default=3600)
+    if queue == HEAVY and soft_time_limit > 0:
+        options["soft_time_limit"] = soft_time_limit
+        options["time_limit"] = soft_time_limit + env.int(
+            "HEAVY_TIME_LIMIT_GRACE", default=60
+        )
+    return options
+
+
+def queue_depths():
+    """Messages waiting and consumers of each queue, None for a queue the
+    broker does not know yet."""
+    # Project Imports
+    from celery_main import app
+
+    depths = {}
+    with app.connection_for_read() as connection:
+        for queue in QUEUES:
+            # a passive declare of a missing queue closes the channel
+            channel = connection.channel()
+            try:
+                _, messages, consumers = channel.queue_declare(
+                    queue=queue, passive=True
+                )
+                depths[queue] = {"messages": messages, "consumers": consumers}
+            except connection.channel_errors:
+                depths[queue] = None
+            finally:
+                channel.close()
+    return depths
@@ -59,6 +59,25 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def validate_params(self, value):
+        # attachments converted by the ingest stage carry their schema, so
+        # column names can be checked without opening the file
+        attachment = self.context.get("attachment", None)
+        if attachment is None or not attachment.schema:
+            return value
+        columns = set(attachment.schema["columns"])
+        requested = list(value.get("features", None) or [])
+        for key in ["excludes", "dummies"]:
+            requested.extend(value.get(key, None) or [])
+        for key in ["target", "group_by"]:
+            if value.get(key, None):
+                requested.append(value[key])
+        if missing := [c for c in requested if c not in columns]:
+            raise serializers.ValidationError(
+                f"Columns not found in the attachment: {', '.join(missing)}"
+            )
+        return value
+
 
 class TaskListSerializer(serializers.ModelSerializer):
     class Meta:
@@ -117,6 +136,8 @@ class ResultCreateUpdateSerializer(serializers.ModelSerializer):
         fields = [
             "result",
             "file",
+            "columnar_file",
+            "model_file",
         ]
 
 
@@ -128,6 +149,7 @@ class AttachmentSerializer(serializers.ModelSerializer):
             "url",
             "file",
             "file_format",
+            "schema",
             "size",
             "updated_at",
             "created_at",
@@ -142,10 +164,15 @@ class AttachmentUploadSerializer(serializers.ModelSerializer):
         ]
 
     def validate_file(self, value):
-        if value.size > env.int("FILE_UPLOAD_MAX_MEMORY_SIZE"):
+        file_suffix = value.name.split(".")[-1]
+        max_size = env.int("FILE_UPLOAD_MAX_MEMORY_SIZE")
+        if file_suffix == "csv":
+            # csv files can be streamed in chunks, so they are not bound by
+            # what a worker can hold in memory
+            max_size = env.int("FILE_UPLOAD_MAX_STREAMING_SIZE", max_size)
+        if value.size > max_size:
             raise serializers.ValidationError("The file is too large.")
 
-        file_suffix = value.name.split(".")[-1]
         if file_suffix not in env.list("FILE_UPLOAD_ALLOWED_SUFFIX"):
             raise serializers.ValidationError("The file type is not allowed.")
 
@@ -1,68 +1,108 @@
+# Standard Library
+import os
+
 # Third-Party Libraries
-import pandas as pd
 from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
 
 # Project Imports
+import forecasters
+from apps.apis.cache import cache_key, is_cacheable
+from apps.apis.downloads import precompress, result_digest
+from apps.apis.events import FAILED, PROCESSING, SUCCESS, publish
 from apps.apis.serializers import ResultCreateUpdateSerializer
-from forecasters import (
-    ClassifierCreator,
-    ClusteringCreator,
-    SentimentAnalyzerCreator,
-    TimeSeriesForecasterCreator,
-)
-from models.task import Task
+from models.task import Attachment, Result, Task
+from settings.base import env
+
+
+def cpu_budget():
+    """Cores one task may use: TASK_CPU_BUDGET, or the machine's cores
+    shared evenly between the worker's pool slots."""
+    if budget := env.int("TASK_CPU_BUDGET", default=0):
+        return budget
+    concurrency = env.int("CELERY_CONCURRENCY", default=1)
+    return max(1, (os.cpu_count() or 1) // concurrency)
 
 
 class TaskObj:
-    def __init__(self, task):  # sourcery skip: raise-specific-error
+    # the web tier imports this module to queue tasks, the forecasters and
+    # the data stack are only imported once a worker runs one
+    creator_name = None
+
+    def __init__(self, task):
+        # Project Imports
+        from apps.apis.loaders import AttachmentLoader
+
         self.file_path = task.attachment.file.path
         self.file_format = task.attachment.file_format
-        if self.file_format == "csv":
-            self.data = pd.read_csv(self.file_path)
-        elif self.file_format == "xlsx":
-            self.data = pd.read_excel(self.file_path)
-        else:
-            raise Exception("File format not supported")
         self.params = task.params
         self.params["task_id"] = task._id
-        self.forecaster = None
+        self.params.setdefault("n_jobs", cpu_budget())
+        self.params.setdefault(
+            "columnar", env.bool("RESULT_COLUMNAR", default=True)
+        )
+        self.data = self.load_data(AttachmentLoader(task.attachment))
+        self.forecaster = self.create_forecaster()
+
+    @property
+    def creator(self):
+        return getattr(forecasters, self.creator_name)
+
+    def load_data(self, loader):
+        # incremental methods consume the attachment chunk by chunk
+        method = self.creator.forecaster_class(self.params["method"])
+        if self.params.get("streaming", False) and getattr(
+            method, "incremental", False
+        ):
+            return loader.chunks(self.params)
+        return loader.load(self.params)
+
+    def create_forecaster(self):
+        return self.creator(
+            self.params["method"], self.data, self.params
+        ).create()
 
     def get_result(self):
         pass
 
 
 class TimeSeriesForecasting(TaskObj):
-    def __init__(self, data):
-        super().__init__(data)
-        self.forecaster = TimeSeriesForecasterCreator(
-            self.params["method"], self.data, self.params
-        ).create()
+    creator_name = "TimeSeriesForecasterCreator"
+
+    def __init__(self, task):
+        if uid := task.params.get("warm_start", None):
+            task.params["start_params"] = self.previous_params(uid)
+        # long sarima fits stop with their best parameters so far
+        if time_limit := env.float("ARIMA_TIME_LIMIT", default=1800):
+            task.params.setdefault("time_limit", time_limit)
+        super().__init__(task)
+
+    @staticmethod
+    def previous_params(uid):
+        """Fitted parameters of the finished task ``uid``, if any."""
+        previous = (
+            Task.objects.filter(uid=uid, result__isnull=False)
+            .select_related("result")
+            .first()
+        )
+        return previous.result.result.get("params", None) if previous else None
 
 
 class Classification(TaskObj):
-    def __init__(self, data):
-        super().__init__(data)
-        self.forecaster = ClassifierCreator(
-            self.params["method"], self.data, self.params
-        ).create()
+    creator_name = "ClassifierCreator"
 
 
 class Clustering(TaskObj):
-    def __init__(self, data):
-        super().__init__(data)
-        self.forecaster = ClusteringCreator(
-            self.params["method"], self.data, self.params
-        ).create()
+    creator_name = "ClusteringCreator"
 
 
 class SentimentAnalysis(TaskObj):
-    def __init__(self, data):
-        super().__init__(data)
+    creator_name = "SentimentAnalyzerCreator"
+
+    def create_forecaster(self):
         if self.params["method"] == "text":
             self.data = self.params["text"]
-        self.forecaster = SentimentAnalyzerCreator(
-            self.params["method"], self.data, self.params
-        ).create()
+        return super().create_forecaster()
 
 
 class TaskCreator:
@@ -84,13 +124,57 @@ class TaskCreator:
 @shared_task
 def execute(task_id):
     task = Task.objects.get(_id=task_id)
-    task_obj = TaskCreator.create_task(task)
-    ret = task_obj.forecaster.forecast()
-    serializer = ResultCreateUpdateSerializer(data=ret)
-    if not serializer.is_valid():
-        raise Exception(serializer.errors)
-    serializer.save()
+    # the view saves the uid once the task is queued, it may not be there yet
+    uid = execute.request.id or task.uid
+    publish(uid, PROCESSING, stage="started", progress=0)
+    try:
+        # keyed before the forecaster gets to touch the params
+        key = cache_key(task) if is_cacheable(task) else None
+        task_obj = TaskCreator.create_task(task)
+        ret = task_obj.forecaster.forecast()
+        publish(uid, PROCESSING, stage="saving", progress=0.9)
+        # csv results carry a Parquet copy for the preview, see ResultWriter
+        if columnar := getattr(ret.get("file", None), "columnar", None):
+            ret["columnar_file"] = columnar
+        serializer = ResultCreateUpdateSerializer(data=ret)
+        if not serializer.is_valid():
+            raise Exception(serializer.errors)
+        serializer.save(cache_key=key)
+        precompress(serializer.instance)
+    except Exception as e:
+        # a finished status ends the event streams of the task
+        Task.objects.filter(_id=task_id).update(status=Task.FAILED[0])
+        if isinstance(e, SoftTimeLimitExceeded):
+            publish(uid, FAILED, error="Time limit exceeded")
+        else:
+            publish(uid, FAILED, error=str(e))
+        raise
     task = Task.objects.get(_id=task._id)
     task.result = serializer.instance
     task.status = Task.STATUS_CHOICES[1][0]
     task.save()
+    publish(uid, SUCCESS, progress=1)
+
+
+@shared_task
+def ingest_attachment(attachment_id):
+    # Project Imports
+    from apps.apis.loaders import AttachmentLoader
+
+    attachment = Attachment.objects.get(_id=attachment_id)
+    AttachmentLoader(attachment).ingest()
+
+
+@shared_task
+def backfill_digests():
+    """Store the digest of results saved before the worker kept one, their
+    downloads are sent with a weak ETag until then."""
+    results = Result.objects.filter(digest__isnull=True).exclude(file="")
+    count = 0
+    for result in results.exclude(file__isnull=True).iterator():
+        try:
+            result_digest(result)
+        except FileNotFoundError:
+            continue
+        count += 1
+    return count
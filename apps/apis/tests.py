@@ -1,18 +1,60 @@
+# Standard Library
+import asyncio
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+
 # Third-Party Libraries
+import joblib
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APIClient, APITestCase
+from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+from statsmodels.tsa.api import Holt, SimpleExpSmoothing
 
 # Project Imports
+from apps.apis import events
+from apps.apis.cache import cache_key, cached_result
+from apps.apis.downloads import result_response, store_variants
+from apps.apis.loaders import AttachmentLoader, ChunkReader
+from apps.apis.previews import read_page, to_arrow_stream, to_records
+from apps.apis.routing import DL, FAST, HEAVY, task_options, task_queue
+from apps.apis.serializers import TaskCreateUpdateSerializer
+from apps.apis.tasks import TaskCreator, cpu_budget
+from celery_main import check_time_limits
 from forecasters import (
     ClassifierCreator,
     ClusteringCreator,
     SentimentAnalyzerCreator,
     TimeSeriesForecasterCreator,
+    methods,
+)
+from forecasters.arima import integrate
+from forecasters.lstm import compiled_lstm
+from forecasters.results import ResultWriter
+from forecasters.sentiment_analysis import (
+    get_analyzer,
+    is_english,
+    word_polarity,
 )
-from models.task import Attachment
-from settings.base import TestUser
+from forecasters.summaries import (
+    ClusterProfile,
+    ConfusionMatrix,
+    forecast_summary,
+)
+from forecasters.sweep import fit_candidate
+from forecasters.vectorized import SmoothingFit
+from models.task import Attachment, Result, Task
+from settings.base import BASE_DIR, TestUser
 
 # Create your tests here.
 
@@ -42,6 +84,37 @@ class TestAPIView(APITestCase):
             original_filename="testfile.xlsx"
         ).exists()
 
+    def test_create_reuses_cached_result(self):
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Token {TestUser.token}"
+        attachment = Attachment.objects.create(
+            file=SimpleUploadedFile("cached.csv", b"a,b\n1,2\n"),
+            original_filename="cached.csv",
+            digest="0" * 64,
+        )
+        params = {"method": "knn", "target": "b", "features": ["a"]}
+        key = cache_key(Task(attachment=attachment, category=1, params=params))
+        result = Result.objects.create(result={"success": True}, cache_key=key)
+        response = self.client.post(
+            "/api/v1/create/",
+            data={
+                "attachment_id": attachment._id,
+                "title": "Cached",
+                "category": 1,
+                # same params in another order, with an execution-only knob
+                "params": {
+                    "features": ["a"],
+                    "target": "b",
+                    "method": "knn",
+                    "n_jobs": 4,
+                },
+            },
+            format="json",
+        )
+        assert response.status_code == 201
+        assert response.data["status"] == "SUCCESS"
+        task = Task.objects.get(uid=response.data["uid"])
+        assert task.result_id == result._id
+
 
 @pytest.mark.django_db
 class TestTask:
@@ -87,6 +160,28 @@ class TestForecasting(TestTask):
         result = forecaster.forecast()
         assert result
 
+    def test_time_series_sweep(self):
+        params = dict(
+            self.params,
+            method="simple_exponential_smoothing",
+            task_id=0,
+            sweep={
+                "distributions": {"alpha": {"low": 0.05, "high": 0.95}},
+                "n_iter": 4,
+                "random_state": 0,
+            },
+        )
+        result = (
+            TimeSeriesForecasterCreator(
+                params["method"], self.data.copy(), params
+            )
+            .create()
+            .forecast()
+        )
+        scores = [r["score"] for r in result["result"]["leaderboard"]]
+        assert scores == sorted(scores, reverse=True)
+        assert len(pd.read_csv(result["file"])) == 4
+
     def test_time_series_forecaster_by_api(self):
         super().test_task_by_api()
 
@@ -126,6 +221,92 @@ class TestClassification(TestTask):
     def test_classification_by_api(self):
         super().test_task_by_api()
 
+    def test_classification_model_scores_new_rows(self):
+        forecaster = ClassifierCreator(
+            "decision_tree", self.data.copy(), dict(self.params, task_id=0)
+        ).create()
+        result = forecaster.forecast()
+        model = joblib.load(io.BytesIO(result["model_file"].read()))
+        rows = self.data.drop(columns=[self.params["target"]]).head(5)
+        assert len(model.predict_rows(rows.to_dict("records"))) == 5
+
+    def test_classification_sweep(self):
+        params = dict(
+            self.params,
+            n_jobs=2,
+            task_id=0,
+            sweep={
+                "grid": {"max_depth": [1, 2, 4], "min_samples_split": [2, 10]},
+                "halving": True,
+                "factor": 2,
+            },
+        )
+        result = (
+            ClassifierCreator("decision_tree", self.data.copy(), params)
+            .create()
+            .forecast()
+        )
+        leaderboard = result["result"]["leaderboard"]
+        assert result["result"]["success"]
+        assert result["result"]["evaluated"] > 6
+        assert leaderboard[0]["fraction"] == 1
+        assert result["result"]["best_params"] == leaderboard[0]["params"]
+
+
+class TestResultCache:
+    def key(self, params, category=1, digest="0" * 64):
+        attachment = Attachment(digest=digest)
+        return cache_key(
+            Task(attachment=attachment, category=category, params=params)
+        )
+
+    def test_key_is_canonical(self):
+        params = {"method": "knn", "features": ["a", "b"], "target": "c"}
+        key = self.key(params)
+        assert key == self.key(dict(reversed(params.items())))
+        # execution-only params do not change what a task computes
+        assert key == self.key(dict(params, n_jobs=8, task_id=3, cache=True))
+        assert key != self.key(dict(params, features=["b", "a"]))
+        assert key != self.key(params, category=2)
+        assert key != self.key(params, digest="1" * 64)
+
+    def test_lookup_waits_for_the_digest(self, monkeypatch):
+        monkeypatch.setenv("RESULT_CACHE_TTL", "60")
+        attachment = Attachment(file="data.csv")
+        task = Task(attachment=attachment, category=1, params={})
+        # no digest yet: no lookup and the file is not read
+        assert cached_result(task) is None
+        assert attachment.digest is None
+
+
+class TestRandomForest:
+    def forecast(self, **params):
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(rng.normal(size=(400, 4)), columns=list("abcd"))
+        data["label"] = (data["a"] - data["b"] + data["c"] > 0).astype(int)
+        params = {"target": "label", "task_id": 0, **params}
+        forecaster = ClassifierCreator("random_forest", data, params).create()
+        return forecaster, forecaster.forecast()
+
+    def test_parameters_pass_through(self):
+        forecaster, _ = self.forecast(n_jobs=2, model_random_state=3)
+        assert forecaster.model.n_jobs == 2
+        assert forecaster.model.random_state == 3
+
+    def test_scores_do_not_depend_on_n_jobs(self):
+        serial, result = self.forecast(n_jobs=1, model_random_state=3)
+        parallel, parallel_result = self.forecast(
+            n_jobs=2, model_random_state=3
+        )
+        assert result["result"]["test_accuracy"] == (
+            parallel_result["result"]["test_accuracy"]
+        )
+        # the votes are summed in another order
+        np.testing.assert_allclose(
+            serial.model.predict_proba(serial.x_test),
+            parallel.model.predict_proba(parallel.x_test),
+        )
+
 
 class TestClustering(TestTask):
     def setup_class(self):
@@ -167,6 +348,56 @@ class TestClustering(TestTask):
         super().test_task_by_api()
 
 
+class TestClusteringModels:
+    @pytest.mark.parametrize(
+        "method, stored",
+        [("kmeans", True), ("spectral", False), ("dbscan", False)],
+    )
+    def test_only_scoring_models_are_stored(self, method, stored):
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(rng.normal(size=(60, 2)), columns=["x", "y"])
+        params = {
+            "features": ["x", "y"],
+            "n_clusters": 2,
+            "eps": 0.3,
+            "task_id": 0,
+        }
+        result = ClusteringCreator(method, data, params).create().forecast()
+        assert ("model_file" in result) == stored
+
+    def test_spectral_halving_sweep(self):
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(rng.normal(size=(120, 2)), columns=["x", "y"])
+        params = {
+            "features": ["x", "y"],
+            "task_id": 0,
+            "n_jobs": 1,
+            "sweep": {
+                "grid": {"n_clusters": [2, 3, 4, 5]},
+                "halving": True,
+                "factor": 2,
+            },
+        }
+        result = (
+            ClusteringCreator("spectral", data, params).create().forecast()
+        )
+        assert result["result"]["success"]
+        assert result["result"]["leaderboard"][0]["fraction"] == 1
+
+
+class TestSweep:
+    def test_failing_subsample_drops_the_candidate(self):
+        class Forecaster:
+            def __init__(self, data, params):
+                pass
+
+            def subsample(self, fraction):
+                raise ValueError("too few rows")
+
+        outcome = fit_candidate(Forecaster, {"data": None}, {}, 0.5)
+        assert outcome == {"score": None, "error": "too few rows"}
+
+
 class TestSentimentAnalysis(TestTask):
     def setup_class(self):
         super().setup_class(self)
@@ -197,3 +428,1108 @@ class TestSentimentAnalysis(TestTask):
 
     def test_sentiment_analysis_by_api(self):
         super().test_task_by_api()
+
+
+class TestSentimentScoring:
+    def test_batches_match_row_by_row_scores(self):
+        comments = [
+            "I really love this product, it works wonderfully well.",
+            "This is the worst purchase I have ever made, awful quality.",
+            np.nan,
+            "",
+            "C'est vraiment un très mauvais produit, je le déteste.",
+            "Das ist wirklich ein schlechtes Produkt und ich hasse es.",
+            None,
+            "The delivery was quick and the support team was helpful.",
+        ]
+        # repeated comments span several batches and processes
+        data = pd.DataFrame({"comments": comments * 3})
+        data["id"] = range(len(data))
+        forecaster = SentimentAnalyzerCreator(
+            "file",
+            data.copy(),
+            {"target": "comments", "n_jobs": 2, "batch_size": 3, "task_id": 0},
+        ).create()
+        forecaster.process()
+
+        analyzer = get_analyzer()
+        keep = [is_english(comment) for comment in data["comments"]]
+        expected = data[keep].copy()
+        expected["sentiment"] = [
+            int(analyzer.polarity_scores(comment)["compound"] >= 0)
+            for comment in expected["comments"]
+        ]
+        assert expected["sentiment"].tolist() == [1, 0, 1] * 3
+        pd.testing.assert_frame_equal(forecaster.data, expected)
+        assert forecaster.throughput["unique"] == 6
+
+    def test_word_polarity_is_cached(self):
+        word_polarity.cache_clear()
+        words = ["love", "great", "hate", "awful", "support"]
+        analyzer = get_analyzer()
+        for _ in range(2):
+            assert [word_polarity(word) for word in words] == [
+                int(analyzer.polarity_scores(word)["compound"] >= 0)
+                for word in words
+            ]
+        assert word_polarity.cache_info().misses == len(words)
+        assert word_polarity.cache_info().hits == len(words)
+
+    def test_word_cache_is_bounded(self, monkeypatch):
+        class Analyzer:
+            def polarity_scores(self, word):
+                return {"compound": 0.0}
+
+        monkeypatch.setattr(
+            "forecasters.sentiment_analysis.get_analyzer", Analyzer
+        )
+        word_polarity.cache_clear()
+        maxsize = word_polarity.cache_info().maxsize
+        for i in range(maxsize + 10):
+            word_polarity(f"word{i}")
+        assert word_polarity.cache_info().currsize == maxsize
+        # the least recently used words were evicted
+        word_polarity("word0")
+        assert word_polarity.cache_info().misses == maxsize + 11
+        word_polarity.cache_clear()
+
+
+class TestAttachmentLoader:
+    def test_load_caches_columnar_copy(self, settings, tmp_path, monkeypatch):
+        settings.MEDIA_ROOT = str(tmp_path)
+        monkeypatch.setenv("ATTACHMENT_CACHE_DIR", str(tmp_path / "cache"))
+        pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}).to_csv(
+            tmp_path / "data.csv", index=False
+        )
+        attachment = Attachment(file="data.csv", file_format="csv")
+
+        loader = AttachmentLoader(attachment)
+        data = loader.load()
+        assert loader.cache_path.exists()
+
+        cached = AttachmentLoader(attachment).load()
+        pd.testing.assert_frame_equal(data, cached)
+
+    def test_ingest_converts_in_chunks(self, settings, tmp_path, monkeypatch):
+        settings.MEDIA_ROOT = str(tmp_path)
+        data = pd.DataFrame(
+            {"a": np.arange(10), "b": list("xyzxyzxyzx"), "c": 0.5}
+        )
+        # the ints of the last chunk turn to fractions and nulls
+        data["a"] = data["a"].astype(object)
+        data.loc[8, "a"], data.loc[9, "a"] = None, 9.5
+        data.to_csv(tmp_path / "data.csv", index=False)
+        attachment = Attachment(file="data.csv", file_format="csv")
+        monkeypatch.setattr(attachment, "save", lambda *args, **kwargs: None)
+
+        AttachmentLoader(attachment).ingest(chunksize=4)
+        assert attachment.digest is not None
+        assert attachment.schema == {
+            "columns": ["a", "b", "c"],
+            "dtypes": {"a": "float64", "b": "object", "c": "float64"},
+            "rows": 10,
+            "nulls": {"a": 1, "b": 0, "c": 0},
+        }
+        converted = pd.read_parquet(attachment.columnar_file.path)
+        pd.testing.assert_frame_equal(
+            converted, pd.read_csv(tmp_path / "data.csv")
+        )
+        # tasks now read the converted copy
+        pd.testing.assert_frame_equal(
+            AttachmentLoader(attachment).load(), converted
+        )
+
+    def test_params_checked_against_schema(self):
+        attachment = Attachment(schema={"columns": ["a", "b", "c"]})
+        serializer = TaskCreateUpdateSerializer(
+            context={"attachment": attachment}
+        )
+        params = {"features": ["a"], "dummies": ["b"], "target": "c"}
+        assert serializer.validate_params(params) == params
+        for key, value in [
+            ("features", ["a", "d"]),
+            ("target", "e"),
+            ("group_by", "f"),
+        ]:
+            with pytest.raises(ValidationError):
+                serializer.validate_params({**params, key: value})
+        # not ingested yet, the worker finds out
+        serializer.context["attachment"] = Attachment()
+        assert serializer.validate_params({"features": ["d"]})
+
+    def test_load_projects_columns(self, settings, tmp_path, monkeypatch):
+        settings.MEDIA_ROOT = str(tmp_path)
+        monkeypatch.setenv("ATTACHMENT_CACHE_DIR", str(tmp_path / "cache"))
+        pd.DataFrame(
+            {"a": [1, 2], "b": ["x", "y"], "c": [0.5, 1.5], "d": [0, 0]}
+        ).to_csv(tmp_path / "data.csv", index=False)
+        attachment = Attachment(file="data.csv", file_format="csv")
+        params = {
+            "features": ["a", "b"],
+            "target": "c",
+            "dtypes": {"b": "category", "c": "float32"},
+        }
+
+        reads = []
+
+        def read_csv(path, **options):
+            reads.append(options)
+            return pd.read_csv(path, **options)
+
+        monkeypatch.setitem(AttachmentLoader.readers, "csv", read_csv)
+        loader = AttachmentLoader(attachment)
+        data = loader.load(params)
+        assert list(data.columns) == ["a", "b", "c"]
+        assert data["b"].dtype == "category"
+        assert data["c"].dtype == np.float32
+        # the parse itself is projected and typed, nothing is cached
+        assert reads == [
+            {
+                "usecols": ["a", "b", "c"],
+                "dtype": {"b": "category", "c": "float32"},
+            }
+        ]
+        assert not loader.cache_path.exists()
+
+        # a full load caches the file, later projections read the copy
+        loader.load()
+        data = AttachmentLoader(attachment).load(params)
+        assert len(reads) == 2
+        assert list(data.columns) == ["a", "b", "c"]
+        assert data["b"].dtype == "category"
+        assert data["c"].dtype == np.float32
+
+
+class TestStreaming:
+    def test_incremental_classifier_on_chunks(self, tmp_path):
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(
+            {
+                "a": rng.normal(size=2000),
+                "b": rng.normal(size=2000),
+                "note": ["unused"] * 2000,
+            }
+        )
+        data["label"] = (data["a"] + data["b"] > 0).astype(int)
+        data.to_csv(tmp_path / "data.csv", index=False)
+        params = {
+            "features": ["a", "b"],
+            "target": "label",
+            "chunksize": 500,
+            "task_id": 0,
+        }
+        chunks = ChunkReader(
+            tmp_path / "data.csv", ["a", "b", "label"], chunksize=500
+        )
+        assert next(iter(chunks))["a"].dtype == np.float32
+
+        result = ClassifierCreator("sgd", chunks, params).create().forecast()
+        assert result["result"]["test_accuracy"] > 90
+        assert len(pd.read_csv(result["file"])) == 2000
+
+
+class TestGroupedForecasting:
+    def test_grouped_task_through_loader(
+        self, settings, tmp_path, monkeypatch
+    ):
+        settings.MEDIA_ROOT = str(tmp_path)
+        monkeypatch.setenv("ATTACHMENT_CACHE_DIR", str(tmp_path / "cache"))
+        rng = np.random.default_rng(0)
+        pd.DataFrame(
+            {
+                "sku": np.repeat(["a", "b", "c"], 20),
+                "date": np.tile(pd.date_range("2020-01-01", periods=20), 3),
+                "sales": rng.normal(10, 2, 60),
+                "note": "unused",
+            }
+        ).to_csv(tmp_path / "data.csv", index=False)
+        task = Task(
+            _id=0,
+            category=0,
+            attachment=Attachment(file="data.csv", file_format="csv"),
+            params={
+                "method": "move_average",
+                "features": ["date"],
+                "target": "sales",
+                "predays": 4,
+                "group_by": "sku",
+            },
+        )
+
+        task_obj = TaskCreator.create_task(task)
+        assert list(task_obj.data.columns) == ["date", "sales", "sku"]
+        result = task_obj.forecaster.forecast()
+        assert result["result"]["groups"] == 3
+        assert set(pd.read_csv(result["file"])["sku"]) == {"a", "b", "c"}
+
+    @pytest.mark.parametrize("method", ["move_average", "linear_regression"])
+    def test_grouped_matches_single_series(self, method):
+        rng = np.random.default_rng(0)
+        data = pd.concat(
+            pd.DataFrame(
+                {
+                    "sku": sku,
+                    "date": pd.date_range("2020-01-01", periods=n),
+                    "sales": rng.normal(10, 2, n) + np.arange(n),
+                }
+            )
+            for sku, n in [("a", 20), ("b", 31), ("c", 25)]
+        )
+        params = {
+            "features": ["date"],
+            "target": "sales",
+            "predays": 4,
+            "task_id": 0,
+        }
+        result = (
+            TimeSeriesForecasterCreator(
+                method,
+                data.sample(frac=1, random_state=0),
+                dict(params, group_by="sku"),
+            )
+            .create()
+            .forecast()
+        )
+        grouped = pd.read_csv(result["file"])
+        assert result["result"]["groups"] == 3
+
+        for sku, frame in data.groupby("sku"):
+            forecaster = TimeSeriesForecasterCreator(
+                method, frame.reset_index(drop=True), dict(params)
+            ).create()
+            forecaster.split_data()
+            forecaster.fit()
+            forecaster.predict()
+            np.testing.assert_allclose(
+                grouped.loc[grouped["sku"] == sku, "pred"],
+                forecaster.data["pred"],
+            )
+
+    @pytest.mark.parametrize(
+        "method", ["simple_exponential_smoothing", "holt"]
+    )
+    def test_grouped_smoothing_matches_single_series(self, method):
+        rng = np.random.default_rng(1)
+        data = pd.concat(
+            pd.DataFrame(
+                {
+                    "sku": sku,
+                    "date": pd.date_range("2020-01-01", periods=n),
+                    "sales": rng.normal(10, 2, n) + np.arange(n),
+                }
+            )
+            for sku, n in [("a", 9), ("b", 40), ("c", 25)]
+        )
+        params = {
+            "features": ["date"],
+            "target": "sales",
+            "predays": 4,
+            "task_id": 0,
+            "alpha": 0.4,
+        }
+        result = (
+            TimeSeriesForecasterCreator(
+                method, data, dict(params, group_by="sku")
+            )
+            .create()
+            .forecast()
+        )
+        grouped = pd.read_csv(result["file"])
+
+        for sku, frame in data.groupby("sku"):
+            forecaster = TimeSeriesForecasterCreator(
+                method, frame.reset_index(drop=True), dict(params)
+            ).create()
+            forecaster.split_data()
+            forecaster.fit()
+            forecaster.predict()
+            np.testing.assert_allclose(
+                grouped.loc[grouped["sku"] == sku, "pred"],
+                forecaster.data["pred"],
+            )
+
+
+class TestSmoothingFit:
+    values = np.random.default_rng(0).normal(10, 2, 30) + np.arange(30)
+
+    @pytest.mark.parametrize(
+        "method", ["estimated", "heuristic", "legacy-heuristic"]
+    )
+    def test_simple_matches_statsmodels(self, method):
+        expected = (
+            SimpleExpSmoothing(self.values, initialization_method=method)
+            .fit(optimized=False, smoothing_level=0.3)
+            .forecast(5)
+        )
+        fit = SmoothingFit.fit(self.values, 0.3, method=method)
+        np.testing.assert_allclose(fit.forecast(5), expected)
+
+    @pytest.mark.parametrize(
+        "method", ["estimated", "heuristic", "legacy-heuristic"]
+    )
+    def test_holt_matches_statsmodels(self, method):
+        expected = (
+            Holt(self.values, initialization_method=method)
+            .fit(optimized=False, smoothing_level=0.3, smoothing_trend=0.1)
+            .forecast(5)
+        )
+        fit = SmoothingFit.fit(self.values, 0.3, 0.1, method=method)
+        np.testing.assert_allclose(fit.forecast(5), expected)
+
+    def test_known_and_short_series(self):
+        expected = (
+            Holt(
+                self.values,
+                initialization_method="known",
+                initial_level=5.0,
+                initial_trend=1.0,
+            )
+            .fit(optimized=False, smoothing_level=0.5, smoothing_trend=0.2)
+            .forecast(3)
+        )
+        fit = SmoothingFit.fit(
+            self.values,
+            0.5,
+            0.2,
+            method="known",
+            initial_level=5.0,
+            initial_trend=1.0,
+        )
+        np.testing.assert_allclose(fit.forecast(3), expected)
+        # below ten observations "estimated" uses the first observations
+        short = SimpleExpSmoothing(
+            self.values[:6], initialization_method="estimated"
+        ).fit(optimized=False, smoothing_level=0.3)
+        np.testing.assert_allclose(
+            SmoothingFit.fit(self.values[:6], 0.3).forecast(2),
+            short.forecast(2),
+        )
+
+
+class TestArimaWarmStart:
+    def test_warm_start_reuses_previous_params(self):
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(
+            {
+                "date": pd.date_range("2020-01-01", periods=121),
+                "sales": np.cumsum(rng.normal(0.5, 1, 121)),
+            }
+        )
+        params = {
+            "features": ["date"],
+            "target": "sales",
+            "predays": 3,
+            "task_id": 0,
+        }
+        first = (
+            TimeSeriesForecasterCreator(
+                "arima", data.iloc[:120].copy(), dict(params)
+            )
+            .create()
+            .forecast()["result"]
+        )
+        assert first["warm_start"] is None
+
+        # one more day of the same series
+        second = (
+            TimeSeriesForecasterCreator(
+                "arima",
+                data.copy(),
+                dict(params, start_params=first["params"]),
+            )
+            .create()
+            .forecast()["result"]
+        )
+        assert second["warm_start"] == "filter"
+        assert second["params"] == first["params"]
+
+        refit = (
+            TimeSeriesForecasterCreator(
+                "arima",
+                data.copy(),
+                dict(params, start_params=first["params"], refit=True),
+            )
+            .create()
+            .forecast()["result"]
+        )
+        assert refit["warm_start"] == "refit"
+
+
+class TestAutoArima:
+    def test_auto_arima_ranks_orders(self):
+        rng = np.random.default_rng(0)
+        noise = rng.normal(size=150)
+        ar = np.zeros(150)
+        for t in range(1, 150):
+            ar[t] = 0.7 * ar[t - 1] + noise[t]
+        data = pd.DataFrame(
+            {
+                "date": pd.date_range("2020-01-01", periods=150),
+                "sales": np.cumsum(ar),
+            }
+        )
+        params = {
+            "features": ["date"],
+            "target": "sales",
+            "predays": 3,
+            "task_id": 0,
+            "n_jobs": 1,
+        }
+        result = (
+            TimeSeriesForecasterCreator("auto_arima", data, params)
+            .create()
+            .forecast()["result"]
+        )
+        assert result["order"][1] == 1
+        assert result["ranking"][0]["order"] == result["order"]
+        aic = [r["aic"] for r in result["ranking"]]
+        assert aic == sorted(aic)
+
+    def test_no_order_fitted(self, monkeypatch):
+        monkeypatch.setattr(
+            "forecasters.arima.information_criterion",
+            lambda y, order, criterion: np.inf,
+        )
+        data = pd.DataFrame(
+            {
+                "date": pd.date_range("2020-01-01", periods=30),
+                "sales": np.arange(30.0),
+            }
+        )
+        params = {
+            "features": ["date"],
+            "target": "sales",
+            "task_id": 0,
+            "n_jobs": 1,
+            "differences": 1,
+        }
+        forecaster = TimeSeriesForecasterCreator(
+            "auto_arima", data, params
+        ).create()
+        with pytest.raises(ValueError, match="no ARIMA order"):
+            forecaster.forecast()
+
+
+class TestSarima:
+    rng = np.random.default_rng(0)
+    values = 10 * np.sin(2 * np.pi * np.arange(200) / 12) + np.cumsum(
+        rng.normal(0.1, 1, 200)
+    )
+    params = {
+        "features": ["date"],
+        "target": "sales",
+        "predays": 5,
+        "task_id": 0,
+        "window": 12,
+    }
+
+    def forecast(self, **params):
+        data = pd.DataFrame(
+            {
+                "date": pd.date_range("2020-01-01", periods=200),
+                "sales": self.values,
+            }
+        )
+        result = (
+            TimeSeriesForecasterCreator(
+                "sarima", data, dict(self.params, **params)
+            )
+            .create()
+            .forecast()
+        )
+        return result["result"], pd.read_csv(result["file"])
+
+    def test_integrate_undoes_differences(self):
+        seasonal = self.values[12:] - self.values[:-12]
+        differenced = np.diff(seasonal)
+        np.testing.assert_allclose(
+            integrate(self.values[:113], differenced[100:110], 1, 1, 12),
+            self.values[113:123],
+        )
+
+    def test_simple_differencing_matches_state_space(self):
+        result, data = self.forecast()
+        simple, simple_data = self.forecast(simple_differencing=True)
+        assert not simple["timed_out"]
+        np.testing.assert_allclose(
+            simple_data["pred"].dropna(), data["pred"].dropna(), rtol=1e-3
+        )
+
+    def test_time_limit_returns_best_so_far(self):
+        result, data = self.forecast(time_limit=1e-6)
+        assert result["timed_out"]
+        assert data["pred"].tail(5).notna().all()
+
+    def test_task_time_limit_defaults_from_settings(
+        self, settings, tmp_path, monkeypatch
+    ):
+        settings.MEDIA_ROOT = str(tmp_path)
+        monkeypatch.setenv("ATTACHMENT_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setenv("ARIMA_TIME_LIMIT", "120")
+        pd.DataFrame(
+            {
+                "date": pd.date_range("2020-01-01", periods=60),
+                "sales": self.values[:60],
+            }
+        ).to_csv(tmp_path / "data.csv", index=False)
+
+        def create(**params):
+            task = Task(
+                _id=0,
+                category=0,
+                attachment=Attachment(file="data.csv", file_format="csv"),
+                params={**self.params, "method": "move_average", **params},
+            )
+            return TaskCreator.create_task(task).params
+
+        assert create()["time_limit"] == 120
+        assert create(time_limit=5)["time_limit"] == 5
+        monkeypatch.setenv("ARIMA_TIME_LIMIT", "0")
+        assert "time_limit" not in create()
+
+
+class TestLSTM:
+    def test_windowed_lstm_reuses_compiled_model(self):
+        values = 50 + 10 * np.sin(2 * np.pi * np.arange(120) / 20)
+        data = pd.DataFrame(
+            {
+                "date": pd.date_range("2020-01-01", periods=120),
+                "sales": values,
+            }
+        )
+        params = {
+            "features": ["date"],
+            "target": "sales",
+            "predays": 5,
+            "task_id": 0,
+            "window": 10,
+            "units": 8,
+        }
+        forecasters = [
+            TimeSeriesForecasterCreator(
+                "lstm", data.copy(), dict(params)
+            ).create()
+            for _ in range(2)
+        ]
+        results = [forecaster.forecast() for forecaster in forecasters]
+        assert forecasters[0].compiled is forecasters[1].compiled
+
+        result = pd.read_csv(results[1]["file"])
+        assert result["pred"].tail(5).notna().all()
+        model = joblib.load(io.BytesIO(results[1]["model_file"].read()))
+        row = {f"lag_{lag}": values[-lag] for lag in range(10, 0, -1)}
+        assert len(model.predict_rows([row])) == 1
+
+    def test_compiled_models_are_not_shared_between_threads(self):
+        architecture = (5, 4, 0.2, "adam", "mean_squared_error")
+        compiled = []
+        threads = [
+            threading.Thread(
+                target=lambda: compiled.extend(
+                    [
+                        compiled_lstm(*architecture),
+                        compiled_lstm(*architecture),
+                    ]
+                )
+            )
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        assert compiled[0] is compiled[1]
+        assert compiled[2] is compiled[3]
+        assert compiled[0] is not compiled[2]
+
+
+class TestLazyImports:
+    def test_web_tier_does_not_import_data_stack(self):
+        # a fresh interpreter, the test run has imported everything already
+        code = (
+            "import sys, time, django; django.setup(); "
+            "start = time.perf_counter(); import analyzer.urls; "
+            "print(time.perf_counter() - start); "
+            "print(','.join(sorted({m.split('.')[0] for m in sys.modules})))"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="settings.base")
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            cwd=BASE_DIR,
+            env=env,
+            text=True,
+        )
+        elapsed, modules = out.stdout.strip().splitlines()[-2:]
+        loaded = set(modules.split(","))
+        heavy = {
+            "keras",
+            "nltk",
+            "numpy",
+            "pandas",
+            "pyarrow",
+            "sklearn",
+            "statsmodels",
+            "tensorflow",
+        }
+        assert not loaded & heavy
+        # generous, the url conf takes well under a second without them
+        assert float(elapsed) < 5
+
+
+class TestMethodRegistry:
+    def test_methods_import_on_first_use(self):
+        registry = methods.MethodRegistry(
+            "time_series",
+            {"holt": methods.Method("forecasters.smoothing:HoltForecaster")},
+        )
+        assert not registry.get("holt").loaded
+        assert registry.load("holt").__name__ == "HoltForecaster"
+        assert registry.get("holt").loaded
+        assert TimeSeriesForecasterCreator.forecaster_class("sarima") is (
+            methods.TIME_SERIES.load("sarima")
+        )
+        assert methods.TIME_SERIES.get("sarima").cost == "heavy"
+
+    def test_entry_points_add_methods(self, monkeypatch):
+        class EntryPoint:
+            def __init__(self, name, value, target):
+                self.name = name
+                self.value = value
+                self.target = target
+
+            def load(self):
+                return self.target
+
+        plugin = methods.Method(
+            "forecasters.time_series:MoveAverageForecaster", cost="medium"
+        )
+        points = [
+            EntryPoint("plugin_average", "plugins:average", plugin),
+            EntryPoint("plugin_class", "plugins:Plugin", dict),
+            # built-in methods are not replaced
+            EntryPoint("holt", "plugins:Holt", plugin),
+        ]
+        monkeypatch.setattr(methods, "entry_points", lambda group: points)
+        registry = methods.MethodRegistry(
+            "time_series",
+            {"holt": methods.Method("forecasters.smoothing:HoltForecaster")},
+        )
+        assert registry.get("plugin_average") is plugin
+        assert registry.load("plugin_class") is dict
+        assert registry.get("holt").path.endswith("HoltForecaster")
+        assert set(registry.describe()) == {
+            "holt",
+            "plugin_average",
+            "plugin_class",
+        }
+        with pytest.raises(KeyError):
+            registry.get("missing")
+
+
+class TestRouting:
+    def route(self, category, params, rows=None):
+        schema = {"rows": rows} if rows else {}
+        task = Task(
+            category=category,
+            params=params,
+            attachment=Attachment(schema=schema),
+        )
+        return task_queue(task)
+
+    def test_routes_by_cost_and_size(self, monkeypatch):
+        monkeypatch.setenv("ROUTING_LARGE_ROWS", "1000")
+        assert self.route(0, {"method": "move_average"}) == FAST
+        assert self.route(0, {"method": "move_average"}, rows=5000) == FAST
+        assert self.route(0, {"method": "sarima"}) == HEAVY
+        assert self.route(0, {"method": "lstm"}) == DL
+        assert self.route(0, {"method": "arima"}) == FAST
+        assert self.route(0, {"method": "arima"}, rows=5000) == HEAVY
+        assert self.route(1, {"method": "knn", "sweep": {"grid": {}}}) == HEAVY
+        # unknown methods fail in the worker
+        assert self.route(2, {"method": "missing"}) == FAST
+
+
+class TestResultWriter:
+    data = pd.DataFrame({"x": np.arange(10), "y": np.linspace(0, 1, 10)})
+
+    def write(self, **options):
+        writer = ResultWriter("result_0", chunksize=3, **options)
+        return writer.write(self.data).close()
+
+    def test_csv_is_written_in_chunks(self):
+        file = self.write()
+        assert file.name == "result_0.csv"
+        pd.testing.assert_frame_equal(pd.read_csv(file), self.data)
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    def test_compressed_csv(self, compression):
+        file = self.write(compression=compression)
+        assert file.name.startswith("result_0.csv.")
+        content = pa.input_stream(
+            pa.py_buffer(file.read()), compression=compression
+        ).read()
+        pd.testing.assert_frame_equal(
+            pd.read_csv(io.BytesIO(content)), self.data
+        )
+
+    def test_parquet_chunks_share_a_schema(self):
+        writer = ResultWriter("result_0", file_format="parquet")
+        writer.write(self.data.head(5).astype({"x": "int8"}))
+        # NaN turns the ints of a later chunk into floats
+        writer.write(self.data.tail(5).assign(x=np.nan))
+        writer.write(self.data.assign(x=1000).astype({"x": "int16"}))
+        file = writer.close()
+        assert file.name == "result_0.parquet"
+        result = pd.read_parquet(io.BytesIO(file.read()))
+        assert len(result) == 20 and result["x"].isna().sum() == 5
+        assert result["x"].max() == 1000
+
+    def test_parquet_fractions_after_integers(self):
+        writer = ResultWriter("result_0", file_format="parquet")
+        writer.write(pd.DataFrame({"x": [1, 2, 3]}))
+        writer.write(pd.DataFrame({"x": [1.5, 2.0, np.nan]}))
+        result = pd.read_parquet(io.BytesIO(writer.close().read()))
+        assert result["x"].tolist()[:5] == [1, 2, 3, 1.5, 2.0]
+        assert result["x"].isna().sum() == 1
+
+    def test_columnar_copy(self):
+        assert self.write().columnar is None
+        assert self.write(columnar=True).columnar.name == "result_0.parquet"
+        writer = ResultWriter("result_0", columnar=True)
+        writer.write(self.data.head(5))
+        sink = writer.columnar
+        # strings do not fit the copy's numeric column
+        writer.write(self.data.tail(5).assign(x="a"))
+        assert writer.columnar is None and not sink.writer.is_open
+        assert sink.file.closed and writer.close().columnar is None
+
+    def test_empty_result_keeps_header(self):
+        file = ResultWriter("result_0").write(self.data.head(0)).close()
+        assert list(pd.read_csv(file).columns) == ["x", "y"]
+
+
+class TestDownloads:
+    content = b"x,y\n" + b"".join(b"%d,%d\n" % (i, i * i) for i in range(100))
+
+    @pytest.fixture
+    def result(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        (tmp_path / "results").mkdir()
+        (tmp_path / "results" / "result_0.csv").write_bytes(self.content)
+        result = Result(file="results/result_0.csv", digest="abc")
+        store_variants(result.file)
+        return result
+
+    def get(self, result, **headers):
+        request = RequestFactory().get("/", **headers)
+        response = result_response(request, result)
+        body = b"".join(getattr(response, "streaming_content", []))
+        return response, body
+
+    def test_full_and_precompressed(self, result):
+        response, body = self.get(result)
+        assert response.status_code == 200 and body == self.content
+        assert response["ETag"] == '"abc"'
+        response, body = self.get(result, HTTP_ACCEPT_ENCODING="gzip, br")
+        assert response["Content-Encoding"] == "gzip"
+        assert gzip.decompress(body) == self.content
+        response, _ = self.get(
+            result, HTTP_ACCEPT_ENCODING="gzip;q=0.5, zstd;q=1"
+        )
+        assert response["Content-Encoding"] == "zstd"
+        response, _ = self.get(result, HTTP_ACCEPT_ENCODING="gzip;q=0")
+        assert not response.has_header("Content-Encoding")
+
+    def test_not_modified_and_ranges(self, result):
+        response, _ = self.get(result, HTTP_IF_NONE_MATCH='W/"abc"')
+        assert response.status_code == 304
+        response, body = self.get(result, HTTP_RANGE="bytes=4-9")
+        assert response.status_code == 206 and body == self.content[4:10]
+        assert response["Content-Range"] == f"bytes 4-9/{len(self.content)}"
+        response, body = self.get(result, HTTP_RANGE="bytes=-5")
+        assert body == self.content[-5:]
+        # a stale If-Range gets the whole file
+        response, body = self.get(
+            result, HTTP_RANGE="bytes=4-9", HTTP_IF_RANGE='"old"'
+        )
+        assert response.status_code == 200 and body == self.content
+        response, _ = self.get(result, HTTP_RANGE="bytes=100000-")
+        assert response.status_code == 416
+
+    def test_weak_etag_without_digest(self, result, monkeypatch):
+        def file_digest(*args):
+            raise AssertionError("hashed in the request")
+
+        monkeypatch.setattr("apps.apis.downloads.file_digest", file_digest)
+        result.digest = None
+        response, body = self.get(result)
+        etag = response["ETag"]
+        assert etag.startswith('W/"') and body == self.content
+        response, _ = self.get(result, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        response, _ = self.get(result, HTTP_ACCEPT_ENCODING="gzip")
+        assert response["ETag"] != etag
+        # If-Range needs a strong validator, the whole file is sent
+        response, body = self.get(
+            result, HTTP_RANGE="bytes=4-9", HTTP_IF_RANGE=etag
+        )
+        assert response.status_code == 200 and body == self.content
+
+    def test_sendfile(self, result, monkeypatch):
+        monkeypatch.setenv("RESULT_SENDFILE", "x-accel-redirect")
+        response, _ = self.get(result, HTTP_ACCEPT_ENCODING="gzip")
+        assert response["X-Accel-Redirect"] == (
+            "/protected/results/result_0.csv.gz"
+        )
+        assert response.content == b""
+
+
+class TestResultPreview:
+    data = pd.DataFrame(
+        {"x": np.arange(25000), "y": np.where(np.arange(25000) < 5, np.nan, 1)}
+    )
+
+    @pytest.fixture
+    def result(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        file = ResultWriter("result_0", columnar=True).write(self.data).close()
+        result = Result()
+        result.file.save(file.name, file, save=False)
+        result.columnar_file.save(
+            file.columnar.name, file.columnar, save=False
+        )
+        return result
+
+    def test_page_from_columnar_copy(self, result):
+        table, total = read_page(result, 19998, 4, ["x"])
+        assert total == 25000 and table.column_names == ["x"]
+        # the page spans two row groups
+        assert table.column("x").to_pylist() == [19998, 19999, 20000, 20001]
+        table, _ = read_page(result, 3, 3)
+        assert to_records(table)[1] == {"x": 4, "y": None}
+        table, _ = read_page(result, 30000, 10)
+        assert table.num_rows == 0
+        with pytest.raises(KeyError):
+            read_page(result, 0, 10, ["missing"])
+
+    def test_non_finite_values_are_null(self):
+        table = pa.table(
+            {"x": [1.5, np.inf, -np.inf, np.nan], "y": list("abcd")}
+        )
+        assert [row["x"] for row in to_records(table)] == [
+            1.5,
+            None,
+            None,
+            None,
+        ]
+
+    def test_csv_fallback_and_arrow_stream(self, result):
+        result.columnar_file = None
+        table, total = read_page(result, 3, 3)
+        assert total is None and to_records(table)[1] == {"x": 4, "y": None}
+        table, _ = read_page(result, 3, 3, ["y"])
+        assert table.column_names == ["y"]
+        with pytest.raises(KeyError, match="missing"):
+            read_page(result, 0, 10, ["x", "missing"])
+        content = to_arrow_stream(table)
+        assert pa.ipc.open_stream(content).read_all().equals(table)
+
+
+class TestSummaries:
+    def test_confusion_matrix_over_batches(self):
+        rng = np.random.default_rng(0)
+        actual = rng.choice(["a", "b", "c"], size=300)
+        predicted = np.where(rng.random(300) < 0.7, actual, "b")
+        confusion = ConfusionMatrix()
+        for start in range(0, 300, 100):
+            confusion.update(
+                actual[start : start + 100], predicted[start : start + 100]
+            )
+        summary = confusion.summary()
+        assert summary["labels"] == ["a", "b", "c"]
+        assert summary["confusion_matrix"] == (
+            confusion_matrix(actual, predicted).tolist()
+        )
+        precision, recall, _, support = precision_recall_fscore_support(
+            actual, predicted
+        )
+        for i, row in enumerate(summary["per_class"]):
+            assert row["precision"] == pytest.approx(precision[i])
+            assert row["recall"] == pytest.approx(recall[i])
+            assert row["support"] == support[i]
+
+    def test_cluster_profile_over_batches(self):
+        data = pd.DataFrame({"x": np.arange(10.0), "y": np.ones(10)})
+        labels = np.array([0, 1] * 5)
+        profile = ClusterProfile(["x", "y"])
+        profile.update(data.iloc[:4], labels[:4])
+        profile.update(data.iloc[4:], labels[4:])
+        clusters = profile.summary()["clusters"]
+        assert [cluster["size"] for cluster in clusters] == [5, 5]
+        assert clusters[1]["centroid"] == {"x": 5.0, "y": 1.0}
+
+    def test_forecast_summary(self):
+        actual = [1.0, 2.0, 3.0, np.nan, np.nan]
+        predicted = [np.nan, 2.5, 2.5, 4.0, 6.0]
+        summary = forecast_summary(actual, predicted)
+        assert summary["forecast"]["count"] == 2
+        assert summary["forecast"]["max"] == 6.0
+        assert summary["residuals"]["mae"] == 0.5
+
+    def test_summaries_stored_with_results(self):
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(
+            {"a": rng.normal(size=200), "b": rng.normal(size=200)}
+        )
+        data["label"] = (data["a"] > 0).astype(int)
+        result = (
+            ClassifierCreator(
+                "decision_tree",
+                data.copy(),
+                {"target": "label", "task_id": 0},
+            )
+            .create()
+            .forecast()["result"]
+        )
+        assert (
+            sum(row["support"] for row in result["summary"]["per_class"]) == 40
+        )
+        result = (
+            ClusteringCreator(
+                "kmeans",
+                data.copy(),
+                {"features": ["a", "b"], "n_clusters": 3, "task_id": 0},
+            )
+            .create()
+            .forecast()["result"]
+        )
+        sizes = [cluster["size"] for cluster in result["summary"]["clusters"]]
+        assert sum(sizes) == 200
+        # stored as strict JSON
+        json.dumps(result, allow_nan=False)
+
+
+class TestTaskEvents:
+    def stream(self, monkeypatch, status, received, published=()):
+        monkeypatch.setattr(events.hub, "start", lambda: None)
+        ready = threading.Event()
+        ready.set()
+        monkeypatch.setattr(events.hub, "ready", ready)
+        monkeypatch.setattr(
+            events,
+            "task_status",
+            lambda uid: status and {"uid": uid, "status": status},
+        )
+        sent = []
+
+        async def receive():
+            if received:
+                return received.pop(0)
+            await asyncio.sleep(1)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            # the worker publishes once the stream is subscribed
+            if message["type"] == "http.response.start" and published:
+                for body in published:
+                    events.hub.dispatch(body)
+
+        asyncio.run(events.task_events({}, receive, send, "abc"))
+        return sent
+
+    def test_status_events(self):
+        task = Task(uid="abc", status=Task.SUCCESS[0])
+        event = events.format_event(events.task_event(task))
+        assert event.startswith("event: success\n")
+        data = json.loads(event.splitlines()[1][len("data: ") :])
+        assert data == {"uid": "abc", "status": "success", "progress": 1}
+        task.status = str(Task.PROCESSING[0])
+        assert events.task_event(task)["status"] == events.PROCESSING
+
+    def test_stream_ends_with_the_task(self, monkeypatch):
+        sent = self.stream(
+            monkeypatch,
+            events.PROCESSING,
+            [{"type": "http.request", "body": b""}],
+            published=[
+                {"uid": "other", "status": events.SUCCESS},
+                {"uid": "abc", "status": events.PROCESSING, "progress": 0.9},
+                {"uid": "abc", "status": events.SUCCESS, "progress": 1},
+            ],
+        )
+        assert sent[0]["status"] == 200
+        bodies = [message["body"].decode() for message in sent[1:]]
+        assert [body.split("\n")[0] for body in bodies[1:-1]] == [
+            "event: processing",
+            "event: processing",
+            "event: success",
+        ]
+        assert bodies[-1] == "" and not sent[-1].get("more_body", False)
+        assert not events.hub.streams
+
+    def test_finished_task_sends_its_status(self, monkeypatch):
+        sent = self.stream(monkeypatch, events.FAILED, [])
+        assert sent[2]["body"].startswith(b"event: failed")
+        assert len(sent) == 4
+
+    def test_disconnect_closes_the_stream(self, monkeypatch):
+        sent = self.stream(
+            monkeypatch,
+            events.PROCESSING,
+            [{"type": "http.request"}, {"type": "http.disconnect"}],
+        )
+        assert len(sent) == 3 and not events.hub.streams
+
+    def test_unknown_task(self, monkeypatch):
+        sent = self.stream(monkeypatch, None, [])
+        assert sent[0]["status"] == 404
+
+    def test_heavy_tasks_get_time_limits(self, monkeypatch):
+        monkeypatch.setenv("HEAVY_SOFT_TIME_LIMIT", "600")
+        monkeypatch.setenv("HEAVY_TIME_LIMIT_GRACE", "30")
+        heavy = Task(category=0, params={"method": "sarima"}, attachment=None)
+        fast = Task(category=0, params={"method": "holt"}, attachment=None)
+        assert task_options(heavy) == {
+            "queue": HEAVY,
+            "soft_time_limit": 600,
+            "time_limit": 630,
+        }
+        assert task_options(fast) == {"queue": FAST}
+        monkeypatch.setenv("HEAVY_SOFT_TIME_LIMIT", "0")
+        assert task_options(heavy) == {"queue": HEAVY}
+
+    def test_pools_without_time_limits_warn(self, monkeypatch, caplog):
+        monkeypatch.delenv("HEAVY_SOFT_TIME_LIMIT", raising=False)
+        assert check_time_limits("prefork", "fast,heavy")
+        assert check_time_limits("solo", "fast,dl")
+        for pool in ["solo", "threads"]:
+            assert not check_time_limits(pool, "heavy")
+        assert "threads pool does not enforce" in caplog.text
+        monkeypatch.setenv("HEAVY_SOFT_TIME_LIMIT", "0")
+        assert check_time_limits("solo", "heavy")
+
+
+class TestCpuBudget:
+    def test_cores_are_split_between_pool_slots(self, monkeypatch):
+        monkeypatch.setattr(os, "cpu_count", lambda: 8)
+        monkeypatch.delenv("TASK_CPU_BUDGET", raising=False)
+        monkeypatch.setenv("CELERY_CONCURRENCY", "1")
+        assert cpu_budget() == 8
+        monkeypatch.setenv("CELERY_CONCURRENCY", "3")
+        assert cpu_budget() == 2
+        # more slots than cores still leaves each task one core
+        monkeypatch.setenv("CELERY_CONCURRENCY", "16")
+        assert cpu_budget() == 1
+        monkeypatch.setattr(os, "cpu_count", lambda: None)
+        assert cpu_budget() == 1
+
+    def test_explicit_budget(self, monkeypatch):
+        monkeypatch.setenv("CELERY_CONCURRENCY", "16")
+        monkeypatch.setenv("TASK_CPU_BUDGET", "3")
+        assert cpu_budget() == 3
+        # 0 falls back to the share of the machine
+        monkeypatch.setenv("TASK_CPU_BUDGET", "0")
+        monkeypatch.setattr(os, "cpu_count", lambda: 32)
+        assert cpu_budget() == 2
@@ -3,10 +3,14 @@ from django.urls import path
 
 from .views import (
     LoginView,
+    PredictView,
+    QueueView,
     ResultFileView,
+    ResultPreviewView,
     ResultView,
     TaskCreateView,
     TaskDetailView,
+    TaskEventsView,
     TaskListView,
     TestView,
     UploadAttachmentView,
@@ -20,6 +24,12 @@ urlpatterns = [
     path("task/<int:pk>/", TaskDetailView.as_view(), name="task-detail"),
     path("result/<str:pk>/", ResultView.as_view(), name="result-detail"),
     path("download/<str:pk>/", ResultFileView.as_view(), name="result-file"),
+    path(
+        "preview/<str:pk>/", ResultPreviewView.as_view(), name="result-preview"
+    ),
+    path("events/<str:pk>/", TaskEventsView.as_view(), name="task-events"),
+    path("predict/<str:pk>/", PredictView.as_view(), name="predict"),
+    path("queues/", QueueView.as_view(), name="queues"),
     path("test/", TestView.as_view(), name="test"),
     path("upload/", UploadAttachmentView.as_view(), name="upload-attachment"),
     path("login/", LoginView.as_view(), name="login"),
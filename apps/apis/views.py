@@ -1,23 +1,37 @@
 # Standard Library
 import logging
+import uuid
 
 # Third-Party Libraries
-from django.http import FileResponse
 from django.shortcuts import get_object_or_404
 from rest_framework.generics import ListAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import (
     AllowAny,
+    IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 # Project Imports
 from models.task import Attachment, Result, Task
+from settings.base import env
+from .cache import cached_result
+from .downloads import result_response
+from .events import RETRY, EventStreamRenderer, format_event, task_event
 from .mixins import BaseMixin
 from .pagination import TaskPagination
 from .permissions import IsOwnerOrReadOnly
+from .previews import (
+    ArrowStreamRenderer,
+    read_page,
+    to_arrow_stream,
+    to_records,
+)
+from .registry import registry
+from .routing import queue_depths, task_options
 from .serializers import (
     AttachmentSerializer,
     AttachmentUploadSerializer,
@@ -27,7 +41,7 @@ from .serializers import (
     TaskDetailSerializer,
     TaskListSerializer,
 )
-from .tasks import execute
+from .tasks import execute, ingest_attachment
 
 # Create your views here.
 
@@ -55,19 +69,29 @@ class TaskCreateView(APIView):
 
     def post(self, request, *args, **kwargs):
         # Create a task
-        serializer = self.serializer_class(data=request.data)
         attachment_id = request.data.get("attachment_id", None)
         if attachment_id is None:
             return Response(
                 {"error": "Attachment ID is required."}, status=400
             )
+        attachment = get_object_or_404(Attachment, _id=attachment_id)
+        serializer = self.serializer_class(
+            data=request.data, context={"attachment": attachment}
+        )
         if serializer.is_valid(raise_exception=True):
             task = serializer.save(
                 owner=self.request.user,
-                attachment=get_object_or_404(Attachment, _id=attachment_id),
+                attachment=attachment,
             )
+        # Identical task already computed: link its result, skip the refit
+        if result := cached_result(task):
+            task.result = result
+            task.status = Task.STATUS_CHOICES[1][0]
+            task.uid = uuid.uuid4().hex
+            task.save()
+            return Response({"uid": task.uid, "status": "SUCCESS"}, status=201)
         # 4. Run task
-        task_uid = execute.delay(task._id).id
+        task_uid = execute.apply_async((task._id,), **task_options(task)).id
         task.uid = task_uid
         task.save()
         return Response({"uid": task_uid, "status": "PENDING"}, status=201)
@@ -107,10 +131,75 @@ class ResultFileView(APIView):
     def get(self, request, *args, **kwargs):
         task = get_object_or_404(Task, uid=self.kwargs["pk"])
         result = task.result
-        if result is None:
+        if result is None or not result.file:
+            return Response({"error": "Result not found."}, status=404)
+        return result_response(request, result)
+
+
+class ResultPreviewView(APIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        ArrowStreamRenderer,
+    ]
+
+    def get(self, request, *args, **kwargs):
+        # A page of result rows, read from the columnar copy of the result
+        task = get_object_or_404(Task, uid=self.kwargs["pk"])
+        result = task.result
+        if result is None or not result.file:
             return Response({"error": "Result not found."}, status=404)
-        file = result.file
-        return FileResponse(file, as_attachment=True, filename=file.name)
+        try:
+            offset = int(request.query_params.get("offset", 0))
+            limit = int(request.query_params.get("limit", 100))
+        except ValueError:
+            return Response(
+                {"error": "Offset and limit must be integers."}, status=400
+            )
+        if offset < 0 or limit < 0:
+            return Response(
+                {"error": "Offset and limit must not be negative."},
+                status=400,
+            )
+        limit = min(limit, env.int("RESULT_PREVIEW_MAX_ROWS", default=1000))
+        columns = request.query_params.get("columns", None)
+        columns = columns.split(",") if columns else None
+        try:
+            table, total = read_page(result, offset, limit, columns)
+        except KeyError as e:
+            return Response({"error": str(e)}, status=400)
+        if request.accepted_renderer.format == ArrowStreamRenderer.format:
+            return Response(to_arrow_stream(table), status=200)
+        return Response(
+            {
+                "offset": offset,
+                "limit": limit,
+                "total": total,
+                "columns": table.column_names,
+                "rows": to_records(table),
+            },
+            status=200,
+        )
+
+
+class PredictView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        # Score new rows with the model fitted by a finished task
+        task = get_object_or_404(Task, uid=self.kwargs["pk"])
+        result = task.result
+        if result is None or not result.model_file:
+            return Response({"error": "Model not found."}, status=404)
+        rows = request.data.get("rows", None)
+        if not rows:
+            return Response({"error": "Rows are required."}, status=400)
+        model = registry.get(result)
+        try:
+            predictions = model.predict_rows(rows)
+        except (KeyError, TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=400)
+        return Response({"predictions": predictions}, status=200)
 
 
 class AttachmentView(APIView):
@@ -139,9 +228,36 @@ class UploadAttachmentView(APIView):
                 owner=self.request.user,
                 file_format=request.data["file"].name.split(".")[-1],
             )
+        if env.bool("ATTACHMENT_INGEST", default=False):
+            ingest_attachment.delay(serializer.instance._id)
         return Response(serializer.data, status=201)
 
 
+class TaskEventsView(APIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = [EventStreamRenderer]
+
+    def get(self, request, *args, **kwargs):
+        # Served by analyzer.asgi.application as a stream, this only answers
+        # under WSGI: the current status, the EventSource comes back after
+        # the retry delay
+        task = get_object_or_404(Task, uid=self.kwargs["pk"])
+        event = f"retry: {RETRY}\n\n" + format_event(task_event(task))
+        return Response(event.encode("utf-8"), status=200)
+
+
+class QueueView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        # Tasks waiting in each queue
+        try:
+            depths = queue_depths()
+        except OSError as e:
+            return Response({"error": str(e)}, status=503)
+        return Response(depths, status=200)
+
+
 class TestView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -1,11 +1,14 @@
 # Standard Library
+import logging
 import os
 
 # Third-Party Libraries
 from celery import Celery, platforms
 
 # Project Imports
-from settings.base import RabbitMQConfig
+from settings.base import RabbitMQConfig, env
+
+logger = logging.getLogger(__name__)
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings.base")
 app = Celery(
@@ -17,13 +20,40 @@ app = Celery(
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 platforms.C_FORCE_ROOT = True
+
+
+def check_time_limits(pool, queues):
+    """Warn when heavy tasks would run unbounded: only the prefork pool
+    enforces the time limits they are sent with, see task_options."""
+    limited = env.int("HEAVY_SOFT_TIME_LIMIT", default=3600) > 0
+    if limited and pool != "prefork" and "heavy" in queues.split(","):
+        logger.warning(
+            "The %s pool does not enforce time limits, heavy tasks are not "
+            "bounded: consume the heavy queue with CELERY_POOL=prefork",
+            pool,
+        )
+        return False
+    return True
+
+
 if __name__ == "__main__":
+    check_time_limits(
+        env("CELERY_POOL", default="solo"),
+        env("CELERY_QUEUES", default="fast,heavy,dl"),
+    )
     app.worker_main(
         [
             "worker",
             "-l",
             "info",
             "-P",
-            "solo",  # solo mode for windows compatibility
+            # solo mode for windows compatibility, prefork or threads to run
+            # several tasks at once
+            env("CELERY_POOL", default="solo"),
+            "-c",
+            env("CELERY_CONCURRENCY", default="1"),
+            # one worker per queue gives each its own pool and prefetch
+            "-Q",
+            env("CELERY_QUEUES", default="fast,heavy,dl"),
         ]
     )
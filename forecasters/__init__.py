@@ -1,7 +1,14 @@
-from .classification import ClassifierCreator
-from .clustering import ClusteringCreator
-from .sentiment_analysis import SentimentAnalyzerCreator
-from .time_series import TimeSeriesForecasterCreator
+# Standard Library
+import importlib
+
+# creators are imported on first access, so importing the package does not
+# load sklearn, statsmodels, TensorFlow or nltk
+_creators = {
+    "TimeSeriesForecasterCreator": ".time_series",
+    "ClassifierCreator": ".classification",
+    "ClusteringCreator": ".clustering",
+    "SentimentAnalyzerCreator": ".sentiment_analysis",
+}
 
 __all__ = [
     "TimeSeriesForecasterCreator",
@@ -9,3 +16,14 @@ __all__ = [
     "ClusteringCreator",
     "SentimentAnalyzerCreator",
 ]
+
+
+def __getattr__(name):
+    if name not in _creators:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_creators[name], __name__)
+    return getattr(module, name)
+
+
+def __dir__():
+    return __all__
@@ -0,0 +1,339 @@
+# Standard Library
+import time
+import warnings
+from functools import lru_cache
+
+# Third-Party Libraries
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import mean_squared_error
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.stattools import kpss
+
+from .time_series import BaseTimeSeriesForecaster
+
+CRITERIA = ("aic", "bic", "aicc", "hqic")
+OPTIMIZERS = (
+    "lbfgs",
+    "bfgs",
+    "newton",
+    "nm",
+    "cg",
+    "ncg",
+    "powell",
+    "basinhopping",
+)
+
+
+class TimeLimitExceeded(Exception):
+    pass
+
+
+class TimeLimit:
+    """Optimizer callback stopping a fit after ``seconds`` of wall-clock
+    time. Keeps the last iterate, in the optimizer's unconstrained space."""
+
+    def __init__(self, seconds):
+        self.deadline = time.monotonic() + seconds
+        self.params = None
+        self.iterations = 0
+
+    def __call__(self, params, *args):
+        self.params = np.array(params, copy=True)
+        self.iterations += 1
+        if time.monotonic() > self.deadline:
+            raise TimeLimitExceeded()
+
+
+def integrate(history, forecast, d=0, seasonal_d=0, period=0):
+    """Undo ``d`` regular and ``seasonal_d`` seasonal differences of
+    ``forecast``, continuing from the undifferenced ``history``."""
+    polynomial = np.array([1.0])
+    for _ in range(d):
+        polynomial = np.convolve(polynomial, [1.0, -1.0])
+    for _ in range(seasonal_d):
+        polynomial = np.convolve(
+            polynomial, np.r_[1.0, np.zeros(period - 1), -1.0]
+        )
+    # y[t] = w[t] + lags[0] * y[t - 1] + lags[1] * y[t - 2] + ...
+    lags = -polynomial[1:]
+    values = np.concatenate([np.asarray(history, dtype=float), forecast])
+    start = len(history)
+    for t in range(start, len(values)):
+        values[t] += lags @ values[t - len(lags) : t][::-1]
+    return values[start:]
+
+
+@lru_cache(maxsize=256)
+def _ndiffs(values, alpha, max_d):
+    y = np.frombuffer(values)
+    for d in range(max_d + 1):
+        try:
+            with warnings.catch_warnings():
+                # p-values outside the lookup table are clipped
+                warnings.simplefilter("ignore")
+                p_value = kpss(np.diff(y, n=d), nlags="auto")[1]
+        except (ValueError, ZeroDivisionError):
+            return d
+        if p_value >= alpha:
+            return d
+    return max_d
+
+
+def ndiffs(y, alpha=0.05, max_d=2):
+    """Differences needed before a KPSS test accepts the series as level
+    stationary. Cached on the series content, so searches over the same
+    data in a worker only run the tests once."""
+    values = np.ascontiguousarray(y, dtype=float).tobytes()
+    return _ndiffs(values, alpha, max_d)
+
+
+def information_criterion(y, order, criterion="aic"):
+    """``criterion`` of an ARIMA ``order`` fitted to ``y``, inf when the
+    fit fails."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            value = getattr(ARIMA(y, order=order).fit(), criterion)
+    except (ArithmeticError, ValueError):
+        return np.inf
+    return float(value) if np.isfinite(value) else np.inf
+
+
+def stepwise_search(y, d, criterion="aic", max_p=5, max_q=5, n_jobs=1):
+    """Hyndman-Khandakar stepwise search over the (p, q) orders.
+
+    Starts from four simple models and moves to the best neighbour
+    (p or q one step up or down) for as long as the criterion improves.
+    Every round of unvisited neighbours is fitted in parallel. Returns
+    the visited (order, criterion) pairs, best first.
+    """
+    scores = {}
+
+    def evaluate(orders):
+        orders = [
+            (p, d, q)
+            for p, q in dict.fromkeys(orders)
+            if 0 <= p <= max_p and 0 <= q <= max_q and (p, d, q) not in scores
+        ]
+        values = parallel(
+            delayed(information_criterion)(y, order, criterion)
+            for order in orders
+        )
+        scores.update(zip(orders, values))
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        evaluate([(2, 2), (0, 0), (1, 0), (0, 1)])
+        best = min(scores, key=scores.get)
+        while True:
+            p, _, q = best
+            evaluate(
+                (p + dp, q + dq)
+                for dp, dq in [
+                    (-1, 0),
+                    (1, 0),
+                    (0, -1),
+                    (0, 1),
+                    (-1, -1),
+                    (1, 1),
+                    (-1, 1),
+                    (1, -1),
+                ]
+            )
+            candidate = min(scores, key=scores.get)
+            if scores[candidate] >= scores[best]:
+                break
+            best = candidate
+    return sorted(scores.items(), key=lambda item: item[1])
+
+
+class ArimaForcaster(BaseTimeSeriesForecaster):
+    def __init__(self, data, params):
+        super().__init__(data, params)
+        self.warm_start = None
+
+    def fit_model(self, model, **options):
+        """Fit ``model``, warm started from the ``start_params`` of a
+        previous fit of the same order when there are any.
+
+        Unless ``refit`` is set the previous parameters are kept as they
+        are and the state is only filtered over the new observations.
+        """
+        start_params = self.params.get("start_params", None) or {}
+        if any(name not in start_params for name in model.param_names):
+            return model.fit(**options)
+        start = [start_params[name] for name in model.param_names]
+        if self.params.get("refit", False):
+            self.warm_start = "refit"
+            return model.fit(start_params=start, **options)
+        self.warm_start = "filter"
+        return model.filter(start)
+
+    def fit(self):
+        autoregressive = self.params.get("autoregressive", 1)
+        moving_average = self.params.get("moving_average", 1)
+        differences = self.params.get("differences", 1)
+        self.model = self.fit_model(
+            ARIMA(
+                self.y_train,
+                order=(autoregressive, differences, moving_average),
+            )
+        )
+
+    def predict(self):
+        self.data["pred"] = np.nan
+        self.test_pred = self.model.predict(
+            start=len(self.y_train),
+            end=len(self.y_train) + len(self.y_test) - 1,
+        )
+        self.data["pred"][-len(self.test_pred) :] = self.test_pred
+        predays = self.params.get("predays", 5)
+        future_pred = self.model.predict(
+            start=self.data.index[-1] + 1,
+            end=self.data.index[-1] + predays,
+        )
+        self.data = self.data.append(pd.DataFrame({"pred": future_pred}))
+
+    def evaluate(self):
+        self.score = np.sqrt(mean_squared_error(self.y_test, self.test_pred))
+
+    def package_results(self):
+        return {
+            "result": {
+                "model": "ARIMA",
+                "RMSE": self.score,
+                # start values for a later task with "warm_start"
+                "params": {
+                    name: float(value)
+                    for name, value in zip(
+                        self.model.model.param_names, self.model.params
+                    )
+                },
+                "warm_start": self.warm_start,
+            },
+            "file": self.generate_result_file(),
+        }
+
+
+class SarimaForcaster(ArimaForcaster):
+    def __init__(self, data, params):
+        super().__init__(data, params)
+        self.simple_differencing = params.get("simple_differencing", False)
+        self.timed_out = False
+
+    def fit(self):
+        autoregressive = self.params.get("autoregressive", 1)
+        moving_average = self.params.get("moving_average", 1)
+        differences = self.params.get("differences", 1)
+        seasonal_autoregressive = self.params.get("seasonal_autoregressive", 1)
+        seasonal_moving_average = self.params.get("seasonal_moving_average", 1)
+        seasonal_differences = self.params.get("seasonal_differences", 1)
+        optimizer = self.params.get("optimizer", "lbfgs")
+        if optimizer not in OPTIMIZERS:
+            raise ValueError(f"Unsupported optimizer {optimizer}")
+        # differencing the data up front keeps the state vector small for
+        # long seasonal periods
+        model = SARIMAX(
+            self.y_train,
+            order=(autoregressive, differences, moving_average),
+            seasonal_order=(
+                seasonal_autoregressive,
+                seasonal_differences,
+                seasonal_moving_average,
+                self.window,
+            ),
+            simple_differencing=self.simple_differencing,
+        )
+        time_limit = self.params.get("time_limit", None)
+        callback = TimeLimit(time_limit) if time_limit else None
+        try:
+            self.model = self.fit_model(
+                model,
+                method=optimizer,
+                maxiter=self.params.get("maxiter", 50),
+                low_memory=self.params.get("low_memory", False),
+                callback=callback,
+                disp=False,
+            )
+        except TimeLimitExceeded:
+            # the best parameters reached so far
+            self.timed_out = True
+            self.model = model.filter(
+                model.transform_params(callback.params)
+                if callback.params is not None
+                else model.start_params
+            )
+
+    def predict(self):
+        n_test = len(self.y_test)
+        predays = self.params.get("predays", 5)
+        forecast = np.asarray(self.model.forecast(n_test + predays))
+        if self.simple_differencing:
+            # the model forecasts the differenced series
+            forecast = integrate(
+                self.y_train,
+                forecast,
+                self.params.get("differences", 1),
+                self.params.get("seasonal_differences", 1),
+                self.window,
+            )
+        self.test_pred = forecast[:n_test]
+        self.data["pred"] = np.nan
+        self.data.loc[self.y_test.index, "pred"] = self.test_pred
+        self.data = self.data.append(pd.DataFrame({"pred": forecast[n_test:]}))
+
+    def package_results(self):
+        ret = super().package_results()
+        ret["result"].update({"model": "SARIMA", "timed_out": self.timed_out})
+        return ret
+
+
+class AutoArimaForecaster(ArimaForcaster):
+    """ARIMA with the order chosen by a stepwise information criterion
+    search, ``differences`` by KPSS tests unless given."""
+
+    def fit(self):
+        criterion = self.params.get("information_criterion", "aic")
+        if criterion not in CRITERIA:
+            raise ValueError(f"Unsupported information criterion {criterion}")
+        y = self.y_train.to_numpy(dtype=float)
+        differences = self.params.get("differences", None)
+        if differences is None:
+            differences = ndiffs(
+                y,
+                alpha=self.params.get("differencing_alpha", 0.05),
+                max_d=self.params.get("max_differences", 2),
+            )
+        self.ranking = stepwise_search(
+            y,
+            differences,
+            criterion=criterion,
+            max_p=self.params.get("max_autoregressive", 5),
+            max_q=self.params.get("max_moving_average", 5),
+            n_jobs=self.n_workers,
+        )
+        self.order, value = self.ranking[0]
+        if not np.isfinite(value):
+            # every order failed, the ranking is arbitrary
+            raise ValueError("no ARIMA order could be fitted")
+        self.model = self.fit_model(ARIMA(self.y_train, order=self.order))
+
+    def package_results(self):
+        ret = super().package_results()
+        criterion = self.params.get("information_criterion", "aic")
+        ret["result"].update(
+            {
+                "model": "AutoARIMA",
+                "order": list(self.order),
+                "ranking": [
+                    {
+                        "order": list(order),
+                        criterion: value if np.isfinite(value) else None,
+                    }
+                    for order, value in self.ranking
+                ],
+            }
+        )
+        return ret
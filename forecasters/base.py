@@ -1,22 +1,148 @@
 # Standard Library
 import io
+import os
 from abc import ABC, abstractmethod
 
 # Third-Party Libraries
+import joblib
+import pandas as pd
 from django.core.files.base import ContentFile
+from threadpoolctl import threadpool_limits
+
+from .results import ResultWriter
+
+
+class FittedModel:
+    """A fitted estimator with the preprocessing needed to score new rows.
+
+    Rows are one-hot encoded like the training data, aligned to the
+    training columns (unseen dummies are dropped, missing ones are zero)
+    and scaled before they reach the estimator.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        features,
+        dummies=None,
+        scaler=None,
+        target_scaler=None,
+    ):
+        self.estimator = estimator
+        self.features = list(features)
+        self.dummies = dummies
+        self.scaler = scaler
+        self.target_scaler = target_scaler
+
+    def prepare(self, data):
+        if self.dummies:
+            data = pd.get_dummies(data, columns=self.dummies)
+        data = data.reindex(columns=self.features, fill_value=0)
+        if self.scaler is not None:
+            data = self.scaler.transform(data)
+        return data
+
+    def predict(self, data):
+        if not hasattr(self.estimator, "predict"):
+            raise ValueError(
+                f"{self.estimator.__class__.__name__} cannot score new rows"
+            )
+        prediction = self.estimator.predict(self.prepare(data))
+        if self.target_scaler is not None:
+            prediction = self.target_scaler.inverse_transform(
+                prediction.reshape(-1, 1)
+            )
+        return prediction.ravel()
+
+    def predict_rows(self, rows):
+        return self.predict(pd.DataFrame(rows)).tolist()
 
 
 class Mixin:
+    def result_writer(self):
+        return ResultWriter(
+            f"result_{self.params['task_id']}",
+            file_format=self.params.get("result_format", "csv"),
+            compression=self.params.get("compression", None),
+            chunksize=self.params.get("result_chunksize", 100000),
+            columnar=self.params.get("columnar", True),
+        )
+
     def generate_result_file(self):
+        return self.result_writer().write(self.data).close()
+
+    def generate_chunked_result_file(self, chunks):
+        writer = self.result_writer()
+        for chunk in chunks:
+            writer.write(chunk)
+        return writer.close()
+
+    def export_model(self):
+        """The FittedModel to persist with the result, if any."""
+        return None
+
+    def generate_model_file(self, model):
         buffer = io.BytesIO()
-        self.data.to_csv(buffer, index=False)
-        buffer.seek(0)
+        joblib.dump(model, buffer)
         return ContentFile(
-            buffer.read(), f"result_{self.params['task_id']}.csv"
+            buffer.getvalue(), f"model_{self.params['task_id']}.joblib"
         )
 
+    def package_model(self, ret):
+        if (model := self.export_model()) is not None:
+            ret["model_file"] = self.generate_model_file(model)
+        return ret
+
+    def summary(self):
+        """Aggregates of the result stored with it, see summaries.py."""
+        return None
+
+    def package_summary(self, ret):
+        if (summary := self.summary()) is not None:
+            ret["result"]["summary"] = summary
+        return ret
+
+
+class CPUBudgetMixin:
+    """Keep a task within its CPU budget.
+
+    ``params["n_jobs"]`` is passed to estimators that parallelize with
+    joblib, and also caps the BLAS/OpenMP thread pools used by numpy and
+    sklearn while the task runs.
+    """
+
+    @property
+    def n_jobs(self):
+        return self.params.get("n_jobs", None)
+
+    @property
+    def n_workers(self):
+        """Processes to fan out over, every core when n_jobs is unset."""
+        if not self.n_jobs or self.n_jobs < 0:
+            return os.cpu_count() or 1
+        return self.n_jobs
 
-class BaseForecaster(ABC, Mixin):
+    def thread_limits(self):
+        limits = self.n_jobs if self.n_jobs and self.n_jobs > 0 else None
+        return threadpool_limits(limits=limits)
+
+
+class ChunkedMixin:
+    """Iterate over the data chunk by chunk, whether it was loaded as one
+    DataFrame or streamed as a re-iterable of DataFrame chunks."""
+
+    incremental = True
+
+    def iter_chunks(self):
+        if isinstance(self.data, pd.DataFrame):
+            chunksize = self.params.get("chunksize", 100000)
+            for start in range(0, len(self.data), chunksize):
+                yield self.data.iloc[start : start + chunksize]
+        else:
+            yield from self.data
+
+
+class BaseForecaster(ABC, Mixin, CPUBudgetMixin):
     def __init__(self, data, params):
         self.data = data
         self.params = params
@@ -43,27 +169,46 @@ class BaseForecaster(ABC, Mixin):
     def package_results(self):
         pass
 
+    def objective(self):
+        """Score the evaluated fit for a sweep, higher is better."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support sweeps"
+        )
+
+    def subsample(self, fraction):
+        """Keep ``fraction`` of the split training rows, used by the
+        successive halving rungs of a sweep."""
+        pass
+
     def forecast(self):
-        self.split_data()
-        self.fit()
-        self.predict()
-        self.evaluate()
-        return self.package_results()
+        with self.thread_limits():
+            self.split_data()
+            self.fit()
+            self.predict()
+            self.evaluate()
+            return self.package_model(
+                self.package_summary(self.package_results())
+            )
 
 
 class BaseForecasterCreator(ABC):
-    forecaster_classes = {}
+    # a MethodRegistry, see methods.py
+    methods = None
 
     def __init__(self, method, data, params):
         self.method = method
         self.data = data
         self.params = params
 
+    @classmethod
+    def forecaster_class(cls, method):
+        return cls.methods.load(method)
+
     def create(self):
-        return self.forecaster_classes[self.method](self.data, self.params)
+        return self.forecaster_class(self.method)(self.data, self.params)
 
 
-class BaseClassifier(ABC, Mixin):
+class BaseClassifier(ABC, Mixin, CPUBudgetMixin):
     def __init__(self, data, params):
         self.data = data
         self.params = params
@@ -83,6 +228,7 @@ class BaseClassifier(ABC, Mixin):
         pass
 
     def forecast(self):
-        self.preprocess()
-        self.process()
-        return self.package_results()
+        with self.thread_limits():
+            self.preprocess()
+            self.process()
+            return self.package_summary(self.package_results())
@@ -1,15 +1,25 @@
 # Third-Party Libraries
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier as RandomForest
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import accuracy_score
 from sklearn.model_selection import train_test_split
 from sklearn.naive_bayes import GaussianNB
 from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
 from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier as DecisionTree
 
-from .base import BaseForecaster, BaseForecasterCreator
+from .base import (
+    BaseForecaster,
+    BaseForecasterCreator,
+    ChunkedMixin,
+    FittedModel,
+)
+from .methods import CLASSIFICATION
+from .summaries import ConfusionMatrix
+from .sweep import SweepCreatorMixin
 
 
 class BaseClassifier(BaseForecaster):
@@ -35,7 +45,7 @@ class BaseClassifier(BaseForecaster):
             self.y_train,
             self.y_test,
         ) = train_test_split(
-            self.data.drop(self.excludes, axis=1),
+            self.data.drop(self.excludes, axis=1, errors="ignore"),
             self.data[self.target],
             test_size=rate,
             random_state=random_state,
@@ -57,6 +67,16 @@ class BaseClassifier(BaseForecaster):
         )
         self.test_accuracy = accuracy_score(self.y_test, self.y_pred) * 100
 
+    def objective(self):
+        return self.test_accuracy
+
+    def subsample(self, fraction):
+        n = max(1, int(len(self.x_train) * fraction))
+        self.x_train = self.x_train.iloc[:n]
+        self.y_train = self.y_train.iloc[:n]
+        # predict writes train then test predictions back onto the rows
+        self.data = self.data.loc[self.x_train.index.append(self.x_test.index)]
+
     def package_results(self):
         return {
             "result": {
@@ -68,6 +88,15 @@ class BaseClassifier(BaseForecaster):
             "file": self.generate_result_file(),
         }
 
+    def summary(self):
+        # on the test split
+        return ConfusionMatrix().update(self.y_test, self.y_pred).summary()
+
+    def export_model(self):
+        return FittedModel(
+            self.model, self.x_train.columns, dummies=self.dummies
+        )
+
 
 class DecisionTreeClassifier(BaseClassifier):
     def __init__(self, data, params):
@@ -89,46 +118,23 @@ class NaiveBayesClassifier(BaseClassifier):
 class RandomForestClassifier(BaseClassifier):
     def __init__(self, data, params):
         super().__init__(data, params)
-
-    def fit(self):
-        n_estimators = self.params.get("n_estimators", 100)
-        max_depth = self.params.get("max_depth", 2)
-        min_samples_split = self.params.get("min_samples_split", 2)
-        model_random_state = self.params.get("model_random_state", 0)
-        self.trees = []
-        for _ in range(n_estimators):
-            tree = DecisionTree(
-                max_depth=max_depth,
-                min_samples_split=min_samples_split,
-                random_state=model_random_state,
-            )
-            tree.fit(self.x_train, self.y_train)
-            self.trees.append(tree)
-
-    def predict(self):
-        predictions = [tree.predict(self.x_test) for tree in self.trees]
-        self.y_pred = np.mean(predictions, axis=0)
-        self.data["prediction"] = self.y_pred
-
-    def evaluate(self):
-        self.test_accuracy = accuracy_score(self.y_test, self.y_pred) * 100
-
-    def package_results(self):
-        return {
-            "result": {
-                "model": "RandomForest",
-                "test_accuracy": self.test_accuracy,
-                "success": True,
-            },
-            "file": self.generate_result_file(),
-        }
+        # bootstrapped trees are fitted and vote in parallel across n_jobs
+        self.model = RandomForest(
+            n_estimators=self.params.get("n_estimators", 100),
+            max_depth=self.params.get("max_depth", 2),
+            min_samples_split=self.params.get("min_samples_split", 2),
+            random_state=self.params.get("model_random_state", 0),
+            n_jobs=self.n_jobs,
+        )
 
 
 class KNNClassifier(BaseClassifier):
     def __init__(self, data, params):
         super().__init__(data, params)
         n_neighbors = self.params.get("n_neighbors", 3)
-        self.model = KNeighborsClassifier(n_neighbors=n_neighbors)
+        self.model = KNeighborsClassifier(
+            n_neighbors=n_neighbors, n_jobs=self.n_jobs
+        )
 
 
 class SVMClassifier(BaseClassifier):
@@ -142,15 +148,106 @@ class SVMClassifier(BaseClassifier):
 class LogisticRegressionClassifier(BaseClassifier):
     def __init__(self, data, params):
         super().__init__(data, params)
-        self.model = LogisticRegression()
-
-
-class ClassifierCreator(BaseForecasterCreator):
-    forecaster_classes = {
-        "decision_tree": DecisionTreeClassifier,
-        "naive_bayes": NaiveBayesClassifier,
-        "random_forest": RandomForestClassifier,
-        "knn": KNNClassifier,
-        "svm": SVMClassifier,
-        "log_regression": LogisticRegressionClassifier,
-    }
+        self.model = LogisticRegression(n_jobs=self.n_jobs)
+
+
+class SGDIncrementalClassifier(ChunkedMixin, BaseForecaster):
+    """Linear classifier trained chunk by chunk with ``partial_fit``.
+
+    Rows are assigned to the test set with a seeded random mask, so the
+    training and scoring passes over the chunks see the same split.
+    """
+
+    def __init__(self, data, params):
+        super().__init__(data, params)
+        self.excludes = list(params.get("excludes", []))
+        self.excludes.append(self.target)
+        self.rate = params.get("rate", 0.2)
+        self.random_state = params.get("random_state", 42)
+        self.scaler = StandardScaler()
+        self.model = SGDClassifier(
+            loss=params.get("loss", "log_loss"),
+            alpha=params.get("alpha", 0.0001),
+            random_state=self.random_state,
+        )
+
+    def split_x(self, chunk):
+        if self.features:
+            return chunk[self.features]
+        return chunk.drop(self.excludes, axis=1, errors="ignore")
+
+    def export_model(self):
+        return FittedModel(
+            self.model, self.scaler.feature_names_in_, scaler=self.scaler
+        )
+
+    def iter_split_chunks(self):
+        rng = np.random.default_rng(self.random_state)
+        for chunk in self.iter_chunks():
+            yield chunk, rng.random(len(chunk)) < self.rate
+
+    def split_data(self):
+        # first pass: label set and feature scaling statistics
+        classes = []
+        for chunk in self.iter_chunks():
+            classes.append(chunk[self.target].unique())
+            self.scaler.partial_fit(self.split_x(chunk))
+        self.classes = np.unique(np.concatenate(classes))
+
+    def fit(self):
+        for chunk, test_mask in self.iter_split_chunks():
+            train = chunk[~test_mask]
+            if len(train):
+                self.model.partial_fit(
+                    self.scaler.transform(self.split_x(train)),
+                    train[self.target],
+                    classes=self.classes,
+                )
+
+    def predict(self):
+        self.counts = {"train": [0, 0], "test": [0, 0]}
+        self.confusion = ConfusionMatrix()
+        self.result_file = self.generate_chunked_result_file(
+            self.predict_chunks()
+        )
+
+    def predict_chunks(self):
+        for chunk, test_mask in self.iter_split_chunks():
+            prediction = self.model.predict(
+                self.scaler.transform(self.split_x(chunk))
+            )
+            correct = prediction == chunk[self.target].to_numpy()
+            for key, mask in (("train", ~test_mask), ("test", test_mask)):
+                self.counts[key][0] += int(correct[mask].sum())
+                self.counts[key][1] += int(mask.sum())
+            self.confusion.update(
+                chunk[self.target].to_numpy()[test_mask], prediction[test_mask]
+            )
+            yield chunk.assign(prediction=prediction)
+
+    def evaluate(self):
+        self.train_accuracy, self.test_accuracy = (
+            correct / total * 100 if total else None
+            for correct, total in (self.counts["train"], self.counts["test"])
+        )
+
+    def objective(self):
+        return self.test_accuracy
+
+    def summary(self):
+        return self.confusion.summary()
+
+    def package_results(self):
+        return {
+            "result": {
+                "model": self.model.__class__.__name__,
+                "train_accuracy": self.train_accuracy,
+                "test_accuracy": self.test_accuracy,
+                "success": True,
+            },
+            "file": self.result_file,
+        }
+
+
+class ClassifierCreator(SweepCreatorMixin, BaseForecasterCreator):
+    methods = CLASSIFICATION
@@ -1,11 +1,24 @@
 # Third-Party Libraries
-from sklearn.cluster import DBSCAN, AgglomerativeClustering, KMeans
+from sklearn.cluster import (
+    DBSCAN,
+    AgglomerativeClustering,
+    KMeans,
+    MiniBatchKMeans,
+)
 from sklearn.cluster import SpectralClustering as Spectral
 from sklearn.metrics import silhouette_score
 from sklearn.mixture import GaussianMixture
 from sklearn.preprocessing import StandardScaler
 
-from .base import BaseForecaster, BaseForecasterCreator
+from .base import (
+    BaseForecaster,
+    BaseForecasterCreator,
+    ChunkedMixin,
+    FittedModel,
+)
+from .methods import CLUSTERING
+from .summaries import ClusterProfile
+from .sweep import SweepCreatorMixin
 
 
 class BaseClustering(BaseForecaster):
@@ -24,7 +37,18 @@ class BaseClustering(BaseForecaster):
         self.data["cluster"] = lables
 
     def evaluate(self):
-        self.silhouette_score = silhouette_score(self.train, self.train_pred)
+        self.silhouette_score = silhouette_score(
+            self.train, self.train_pred, n_jobs=self.n_jobs
+        )
+
+    def objective(self):
+        return self.silhouette_score
+
+    def subsample(self, fraction):
+        n = max(2, int(len(self.train) * fraction))
+        # a frame, or an array once scaled
+        self.train = self.train[:n]
+        self.data = self.data.iloc[:n]
 
     def package_results(self):
         return {
@@ -35,6 +59,23 @@ class BaseClustering(BaseForecaster):
             "file": self.generate_result_file(),
         }
 
+    def summary(self):
+        # centroids in the units of the features, before any scaling
+        return (
+            ClusterProfile(self.features)
+            .update(self.data, self.train_pred)
+            .summary()
+        )
+
+    def export_model(self):
+        # spectral, hierarchical and dbscan only label the rows they were
+        # fitted on, their graph state is not worth storing
+        if not hasattr(self.model, "predict"):
+            return None
+        return FittedModel(
+            self.model, self.features, scaler=getattr(self, "scaler", None)
+        )
+
 
 class KMeansClustering(BaseClustering):
     def __init__(self, data, params):
@@ -68,6 +109,7 @@ class SpectralClustering(BaseClustering):
             n_clusters=n_clusters,
             affinity=affinity,
             assign_labels=assign_labels,
+            n_jobs=self.n_jobs,
         )
 
     def split_data(self):
@@ -83,7 +125,9 @@ class DBSCANClustering(BaseClustering):
         eps = self.params.get("eps", 3)
         min_samples = self.params.get("min_samples", 2)
         metric = self.params.get("metric", "euclidean")
-        self.model = DBSCAN(eps=eps, min_samples=min_samples, metric=metric)
+        self.model = DBSCAN(
+            eps=eps, min_samples=min_samples, metric=metric, n_jobs=self.n_jobs
+        )
 
     def predict(self):
         self.train_pred = self.model.fit_predict(self.train)
@@ -112,11 +156,63 @@ class GaussianMixtureClustering(BaseClustering):
         }
 
 
-class ClusteringCreator(BaseForecasterCreator):
-    forecaster_classes = {
-        "kmeans": KMeansClustering,
-        "hierarchical": HierarchicalClustering,
-        "spectral": SpectralClustering,
-        "dbscan": DBSCANClustering,
-        "gaussian_mixture": GaussianMixtureClustering,
-    }
+class MiniBatchKMeansClustering(ChunkedMixin, BaseClustering):
+    def __init__(self, data, params):
+        super().__init__(data, params)
+        n_clusters = self.params.get("n_clusters", 5)
+        self.model = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            random_state=self.params.get("random_state", None),
+            n_init=3,
+        )
+
+    def split_data(self):
+        pass
+
+    def fit(self):
+        for chunk in self.iter_chunks():
+            self.model.partial_fit(chunk[self.features])
+
+    def predict(self):
+        self.silhouette_score = None
+        self.profile = ClusterProfile(self.features)
+        self.result_file = self.generate_chunked_result_file(
+            self.predict_chunks()
+        )
+
+    def predict_chunks(self):
+        for chunk in self.iter_chunks():
+            labels = self.model.predict(chunk[self.features])
+            if self.silhouette_score is None and len(set(labels)) > 1:
+                # scored on a sample of the first chunk only
+                self.silhouette_score = float(
+                    silhouette_score(
+                        chunk[self.features],
+                        labels,
+                        sample_size=min(len(chunk), 10000),
+                        random_state=self.params.get("random_state", None),
+                        n_jobs=self.n_jobs,
+                    )
+                )
+            self.profile.update(chunk, labels)
+            yield chunk.assign(cluster=labels)
+
+    def evaluate(self):
+        pass
+
+    def summary(self):
+        return self.profile.summary()
+
+    def package_results(self):
+        return {
+            "result": {
+                "model": self.model.__class__.__name__,
+                "silhouette_score": self.silhouette_score,
+                "success": True,
+            },
+            "file": self.result_file,
+        }
+
+
+class ClusteringCreator(SweepCreatorMixin, BaseForecasterCreator):
+    methods = CLUSTERING
@@ -0,0 +1,273 @@
+# Standard Library
+import copy
+
+# Third-Party Libraries
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from . import vectorized
+from .base import CPUBudgetMixin, Mixin
+from .summaries import forecast_summary
+
+
+def forecast_groups(forecaster_class, params, group_by, groups):
+    """Run a single-series forecaster over a batch of (key, frame) pairs."""
+    frames, scores, errors = [], {}, {}
+    for key, frame in groups:
+        forecaster = forecaster_class(frame, copy.deepcopy(params))
+        try:
+            forecaster.split_data()
+            forecaster.fit()
+            forecaster.predict()
+            forecaster.evaluate()
+        except (ArithmeticError, LookupError, TypeError, ValueError) as e:
+            errors[key] = str(e)
+            continue
+        # future rows appended by predict get the key too
+        frames.append(forecaster.data.assign(**{group_by: key}))
+        scores[key] = float(forecaster.score)
+    return frames, scores, errors
+
+
+class GroupedForecaster(Mixin, CPUBudgetMixin):
+    """One method over every series of an attachment.
+
+    ``group_by`` names the column splitting the attachment into series.
+    Moving average, linear regression and smoothing with fixed parameters
+    are computed for all series at once on a (series x time) array, the
+    other methods fit one model per series in batches across ``n_jobs``
+    processes. Every series ends up in
+    one result file.
+    """
+
+    def __init__(self, method, forecaster_class, data, params):
+        self.method = method
+        self.forecaster_class = forecaster_class
+        self.data = data
+        self.params = params
+        self.group_by = params["group_by"]
+        self.features = params.get("features", None)
+        self.target = params.get("target", None)
+        self.window = params.get("window", 3)
+        self.time_format = params.get("time_format", "%Y-%m-%d")
+        self.predays = params.get("predays", 30)
+        self.errors = {}
+
+    @property
+    def vectorized(self):
+        methods = {
+            "move_average": self.move_average,
+            "linear_regression": self.linear_regression,
+        }
+        initialization = self.params.get("initialization_method", "estimated")
+        fixed = not self.params.get("optimazed", False) and (
+            initialization in vectorized.INITIALIZATION_METHODS
+        )
+        if fixed:
+            methods["simple_exponential_smoothing"] = self.smoothing
+            methods["holt"] = lambda: self.smoothing(
+                beta=self.params.get("beta", 0.2)
+            )
+        return methods
+
+    def split_data(self):
+        time = self.features[0]
+        self.data = self.data.dropna(subset=[self.group_by])
+        self.data[time] = pd.to_datetime(
+            self.data[time], format=self.time_format
+        )
+        self.data = self.data.sort_values(
+            [self.group_by, time], kind="stable"
+        ).reset_index(drop=True)
+        self.codes, self.keys = pd.factorize(self.data[self.group_by])
+        self.positions = self.data.groupby(self.codes).cumcount().to_numpy()
+        self.lengths = np.bincount(self.codes)
+
+    def matrix(self):
+        return vectorized.stack(
+            self.data[self.target].to_numpy(dtype=float),
+            self.codes,
+            self.positions,
+            len(self.keys),
+            self.lengths.max(),
+        )
+
+    def move_average(self):
+        matrix = self.matrix()
+        roll = vectorized.rolling_mean(matrix, self.window)
+        self.data["pred"] = roll[self.codes, self.positions]
+        # the single-series forecaster repeats roll_mean.iloc[-window]
+        last = np.full(len(self.keys), np.nan)
+        has_last = self.lengths >= self.window
+        last[has_last] = roll[has_last, (self.lengths - self.window)[has_last]]
+        self.scores = vectorized.row_corr(matrix, roll)
+        return pd.DataFrame(
+            {
+                self.group_by: np.repeat(self.keys, self.predays),
+                "pred": np.repeat(last, self.predays),
+            }
+        )
+
+    def linear_regression(self):
+        pred, self.scores, future = vectorized.linear_trend(
+            self.matrix(),
+            self.lengths,
+            self.params.get("rate", 0.2),
+            self.predays,
+        )
+        self.data["time"] = self.positions
+        self.data["pred"] = pred[self.codes, self.positions]
+        return pd.DataFrame(
+            {
+                self.group_by: np.repeat(self.keys, self.predays),
+                "time": (
+                    self.lengths[:, None] + np.arange(self.predays)
+                ).ravel(),
+                "pred": future.ravel(),
+            }
+        )
+
+    def smoothing(self, beta=None):
+        matrix = self.matrix()
+        rate = self.params.get("rate", 0.2)
+        n_train = self.lengths - np.ceil(rate * self.lengths).astype(int)
+        steps = np.arange(matrix.shape[1])[None, :]
+        train = np.where(steps < n_train[:, None], matrix, np.nan)
+        level, trend = vectorized.initial_states(
+            train,
+            n_train,
+            self.params.get("initialization_method", "estimated"),
+            self.params.get("initial_level", None),
+            self.params.get("initial_trend", None),
+        )
+        level, trend = vectorized.exponential_smoothing(
+            train, n_train, self.params.get("alpha", 0.2), beta, level, trend
+        )
+        n_test = self.lengths - n_train
+        forecast = vectorized.smoothing_forecast(
+            level, trend, n_test.max() + self.predays
+        )
+        # test rows get the forecast over the test horizon
+        horizon = self.positions - n_train[self.codes]
+        test = horizon >= 0
+        pred = np.full(len(self.data), np.nan)
+        pred[test] = forecast[self.codes[test], horizon[test]]
+        self.data["pred"] = pred
+        errors = (self.data[self.target].to_numpy(dtype=float) - pred)[test]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            squares = np.bincount(
+                self.codes[test], weights=errors**2, minlength=len(self.keys)
+            )
+            self.scores = np.sqrt(squares / n_test)
+        for key in self.keys[np.isnan(level)]:
+            self.errors[key] = "Too few observations to initialize"
+        future = np.take_along_axis(
+            forecast, n_test[:, None] + np.arange(self.predays), axis=1
+        )
+        return pd.DataFrame(
+            {
+                self.group_by: np.repeat(self.keys, self.predays),
+                "pred": future.ravel(),
+            }
+        )
+
+    def single_params(self):
+        params = copy.deepcopy(self.params)
+        params.pop("group_by")
+        params["predays"] = self.predays
+        # the groups own the cores, each fit runs on one
+        params["n_jobs"] = 1
+        return params
+
+    def fit_groups(self):
+        groups = [
+            (key, frame.reset_index(drop=True))
+            for key, frame in self.data.groupby(self.group_by, sort=False)
+        ]
+        # a few batches per process keep the pickling overhead down
+        n_batches = max(1, min(len(groups), self.n_workers * 4))
+        bounds = np.linspace(0, len(groups), n_batches + 1).astype(int)
+        results = Parallel(n_jobs=self.n_workers)(
+            delayed(forecast_groups)(
+                self.forecaster_class,
+                self.single_params(),
+                self.group_by,
+                groups[start:stop],
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        )
+        frames, scores = [], {}
+        for batch_frames, batch_scores, batch_errors in results:
+            frames.extend(batch_frames)
+            scores.update(batch_scores)
+            self.errors.update(batch_errors)
+        self.scores = np.array(
+            [scores.get(key, np.nan) for key in self.keys], dtype=float
+        )
+        self.data = pd.concat(frames, ignore_index=True) if frames else None
+
+    def fit(self):
+        if self.method in self.vectorized:
+            future = self.vectorized[self.method]()
+            self.data = pd.concat([self.data, future], ignore_index=True)
+            # each series is followed by its own future rows
+            self.data = self.data.sort_values(self.group_by, kind="stable")
+        else:
+            self.fit_groups()
+
+    def package_results(self):
+        scored = self.scores[~np.isnan(self.scores)]
+        summary = (
+            {
+                "mean": float(scored.mean()),
+                "median": float(np.median(scored)),
+                "min": float(scored.min()),
+                "max": float(scored.max()),
+            }
+            if len(scored)
+            else None
+        )
+        return {
+            "result": {
+                "model": "Grouped",
+                "method": self.method,
+                "groups": len(self.keys),
+                "failed": len(self.errors),
+                "score": summary,
+                "errors": {
+                    str(key): error
+                    for key, error in list(self.errors.items())[:10]
+                },
+                "success": self.data is not None,
+            },
+            "file": (
+                self.generate_result_file() if self.data is not None else None
+            ),
+        }
+
+    def summary(self):
+        # over the rows of every series
+        if self.data is None:
+            return None
+        return forecast_summary(self.data[self.target], self.data["pred"])
+
+    def forecast(self):
+        with self.thread_limits():
+            self.split_data()
+            self.fit()
+            return self.package_summary(self.package_results())
+
+
+class GroupedCreatorMixin:
+    """Creates a GroupedForecaster when the params carry a ``group_by``."""
+
+    def create(self):
+        if self.params.get("group_by", None):
+            return GroupedForecaster(
+                self.method,
+                self.forecaster_class(self.method),
+                self.data,
+                self.params,
+            )
+        return super().create()
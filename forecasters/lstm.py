@@ -0,0 +1,203 @@
+# Standard Library
+import threading
+from functools import lru_cache
+
+# Third-Party Libraries
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from keras.layers import LSTM, Dense, Dropout
+from keras.models import Sequential
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.metrics import mean_squared_error
+from sklearn.preprocessing import MinMaxScaler
+
+from .base import FittedModel
+from .time_series import BaseTimeSeriesForecaster
+
+
+def windows(series, window):
+    """Every run of ``window`` consecutive values, as a read-only view of
+    ``series`` rather than a copy."""
+    return sliding_window_view(series, window)
+
+
+def dataset(x, y, batch_size, seed=None):
+    return (
+        tf.data.Dataset.from_tensor_slices((x[..., None], y))
+        .shuffle(len(x), seed=seed)
+        .batch(batch_size)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+
+class CompiledLSTM:
+    """A compiled network predicting the next value from a window.
+
+    Built and compiled once per architecture in a worker thread, so the
+    traced training and forecasting graphs are reused; every task starts
+    from the initial weights and optimizer state again.
+    """
+
+    def __init__(self, window, units, dropout, optimizer, loss):
+        self.model = Sequential(
+            [
+                LSTM(units=units, input_shape=(window, 1)),
+                Dropout(dropout),
+                Dense(units=1),
+            ]
+        )
+        self.model.compile(optimizer=optimizer, loss=loss)
+        self.model.optimizer.build(self.model.trainable_variables)
+        self.initial_weights = self.model.get_weights()
+        self.initial_state = [
+            variable.numpy() for variable in self.model.optimizer.variables
+        ]
+        self.forecast_steps = tf.function(self._forecast_steps)
+
+    def reset(self):
+        self.model.set_weights(self.initial_weights)
+        for variable, value in zip(
+            self.model.optimizer.variables, self.initial_state
+        ):
+            variable.assign(value)
+        return self.model
+
+    def _forecast_steps(self, window, steps):
+        """Forecast ``steps`` values recursively, each prediction is fed
+        back into the window, in a single graph call."""
+        predictions = tf.TensorArray(tf.float32, size=steps)
+        for step in tf.range(steps):
+            value = self.model(tf.reshape(window, (1, -1, 1)), training=False)
+            predictions = predictions.write(step, value[0, 0])
+            window = tf.concat([window[1:], value[0]], axis=0)
+        return predictions.stack()
+
+    def forecast(self, window, steps):
+        return self.forecast_steps(
+            tf.constant(window, dtype=tf.float32),
+            tf.constant(steps, dtype=tf.int32),
+        ).numpy()
+
+
+local = threading.local()
+
+
+def compiled_lstm(window, units, dropout, optimizer, loss):
+    """The CompiledLSTM of an architecture, cached per thread: tasks run by
+    a threads pool must not reset and train the same model at once."""
+    if not hasattr(local, "compiled"):
+        local.compiled = lru_cache(maxsize=8)(CompiledLSTM)
+    return local.compiled(window, units, dropout, optimizer, loss)
+
+
+class WindowEstimator:
+    """Scores rows holding the last ``window`` values of the series, as
+    lag_<window> .. lag_1 columns, with a fitted window network."""
+
+    def __init__(self, model, scaler):
+        self.model = model
+        self.scaler = scaler
+
+    def predict(self, data):
+        values = np.asarray(data, dtype=float)
+        scaled = self.scaler.transform(values.reshape(-1, 1))
+        return self.model.predict(
+            scaled.reshape(*values.shape, 1), verbose=0
+        ).ravel()
+
+
+class LSTMForecaster(BaseTimeSeriesForecaster):
+    """Predicts each value from the ``window`` values before it, the future
+    is forecast recursively from the last window."""
+
+    def __init__(self, data, params):
+        super().__init__(data, params)
+        self.scaler = MinMaxScaler(feature_range=(0, 1))
+
+    def split_data(self):
+        super().split_data()
+        values = self.data[self.target].to_numpy(dtype=float)
+        self.n_train = len(self.y_train)
+        if self.n_train <= self.window:
+            raise ValueError(
+                f"Training rows must outnumber the window of {self.window}"
+            )
+        self.scaler.fit(values[: self.n_train, None])
+        self.series = (
+            self.scaler.transform(values[:, None]).ravel().astype(np.float32)
+        )
+        # the window ending before position t predicts the value at t
+        x = windows(self.series, self.window)[:-1]
+        targets = self.series[self.window :]
+        split = self.n_train - self.window
+        self.x_train, self.x_test = x[:split], x[split:]
+        self.y_train = targets[:split]
+        self.y_test = values[self.n_train :]
+
+    def subsample(self, fraction):
+        n = max(1, int(len(self.y_train) * fraction))
+        self.x_train = self.x_train[-n:]
+        self.y_train = self.y_train[-n:]
+
+    def fit(self):
+        self.compiled = compiled_lstm(
+            self.window,
+            self.params.get("units", 50),
+            self.params.get("dropout", 0.2),
+            self.params.get("optimizer", "adam"),
+            self.params.get("loss", "mean_squared_error"),
+        )
+        self.model = self.compiled.reset()
+        self.model.fit(
+            dataset(
+                self.x_train,
+                self.y_train,
+                self.params.get("batch_size", 32),
+                seed=self.params.get("random_state", None),
+            ),
+            epochs=self.params.get("epochs", 1),
+            verbose=0,
+        )
+
+    def inverse(self, values):
+        return self.scaler.inverse_transform(
+            np.asarray(values).reshape(-1, 1)
+        ).ravel()
+
+    def predict(self):
+        self.y_pred = self.inverse(
+            self.model(self.x_test[..., None], training=False)
+        )
+        self.data["pred"] = np.nan
+        self.data.loc[self.data.index[self.n_train :], "pred"] = self.y_pred
+        # predict future
+        predays = self.params["predays"]  # number of features
+        future_frame = pd.DataFrame(
+            {"time": np.arange(len(self.data), len(self.data) + predays)}
+        )
+        future_frame["pred"] = self.inverse(
+            self.compiled.forecast(self.series[-self.window :], predays)
+        )
+        # add future time to data
+        self.data = self.data.append(future_frame)
+
+    def evaluate(self):
+        self.score = np.sqrt(mean_squared_error(self.y_test, self.y_pred))
+
+    def package_results(self):
+        return {
+            "result": {
+                "model": "LSTM",
+                "RMSE": self.score,
+            },
+            "file": self.generate_result_file(),
+        }
+
+    def export_model(self):
+        # rows hold the last window values, oldest first
+        return FittedModel(
+            WindowEstimator(self.model, self.scaler),
+            [f"lag_{lag}" for lag in range(self.window, 0, -1)],
+            target_scaler=self.scaler,
+        )
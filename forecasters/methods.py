@@ -0,0 +1,288 @@
+# Standard Library
+import importlib
+from importlib import metadata
+
+# Only the standard library is imported here, so the web tier can list the
+# methods and read their metadata without loading any of the model
+# libraries.
+
+COSTS = ("light", "medium", "heavy")
+MEMORY_CLASSES = ("small", "medium", "large")
+
+
+def load_class(path):
+    """Import the class at ``"package.module:Class"``."""
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+class Method:
+    """A registered method, its class is imported on first use.
+
+    ``cost`` is the expected fit time on a typical attachment, ``parallel``
+    whether the fit uses the task's ``n_jobs`` cores, ``memory`` the peak
+    memory relative to the data and ``library`` the main library the
+    method imports.
+    """
+
+    def __init__(
+        self, path, cost="light", parallel=False, memory="small", library=None
+    ):
+        if cost not in COSTS:
+            raise ValueError(f"Unsupported cost {cost}")
+        if memory not in MEMORY_CLASSES:
+            raise ValueError(f"Unsupported memory class {memory}")
+        self.path = path
+        self.cost = cost
+        self.parallel = parallel
+        self.memory = memory
+        self.library = library
+        self._class = None
+
+    def load(self):
+        if self._class is None:
+            self._class = load_class(self.path)
+        return self._class
+
+    @property
+    def loaded(self):
+        return self._class is not None
+
+    def describe(self):
+        return {
+            "path": self.path,
+            "cost": self.cost,
+            "parallel": self.parallel,
+            "memory": self.memory,
+            "library": self.library,
+        }
+
+
+def entry_points(group):
+    points = metadata.entry_points()
+    if hasattr(points, "select"):
+        return points.select(group=group)
+    # Python < 3.10
+    return points.get(group, [])
+
+
+class MethodRegistry:
+    """The methods of one category by name.
+
+    Other installed packages add methods through the
+    ``forecasters.<category>`` entry point group, each entry point names a
+    Method (metadata known without importing the forecaster) or directly a
+    forecaster class (default metadata). Entry points are read the first
+    time a method is not found among the registered ones, or the methods
+    are listed.
+    """
+
+    def __init__(self, category, methods):
+        self.category = category
+        self.methods = dict(methods)
+        self.discovered = False
+
+    @property
+    def group(self):
+        return f"forecasters.{self.category}"
+
+    def register(self, name, method):
+        if isinstance(method, str):
+            method = Method(method)
+        self.methods[name] = method
+        return method
+
+    def discover(self):
+        if self.discovered:
+            return
+        self.discovered = True
+        for point in entry_points(self.group):
+            # built-in methods cannot be replaced
+            if point.name in self.methods:
+                continue
+            method = point.load()
+            if not isinstance(method, Method):
+                forecaster_class = method
+                method = Method(point.value)
+                method._class = forecaster_class
+            self.methods[point.name] = method
+
+    def get(self, name):
+        if name not in self.methods:
+            self.discover()
+        if name not in self.methods:
+            raise KeyError(f"Unsupported {self.category} method {name}")
+        return self.methods[name]
+
+    def load(self, name):
+        return self.get(name).load()
+
+    def __contains__(self, name):
+        try:
+            self.get(name)
+        except KeyError:
+            return False
+        return True
+
+    def names(self):
+        self.discover()
+        return list(self.methods)
+
+    def describe(self):
+        self.discover()
+        return {
+            name: method.describe() for name, method in self.methods.items()
+        }
+
+
+TIME_SERIES = MethodRegistry(
+    "time_series",
+    {
+        "linear_regression": Method(
+            "forecasters.time_series:LinearRegressionForecaster",
+            library="sklearn",
+        ),
+        "move_average": Method(
+            "forecasters.time_series:MoveAverageForecaster",
+            library="pandas",
+        ),
+        "lstm": Method(
+            "forecasters.lstm:LSTMForecaster",
+            cost="heavy",
+            memory="large",
+            library="tensorflow",
+        ),
+        "simple_exponential_smoothing": Method(
+            "forecasters.smoothing:SimpleExponentialSmoothingForecaster",
+            library="statsmodels",
+        ),
+        "holt": Method(
+            "forecasters.smoothing:HoltForecaster",
+            library="statsmodels",
+        ),
+        "holt_winters_seasonal": Method(
+            "forecasters.smoothing:HoltWintersSeasonalForecaster",
+            cost="medium",
+            library="statsmodels",
+        ),
+        "arima": Method(
+            "forecasters.arima:ArimaForcaster",
+            cost="medium",
+            library="statsmodels",
+        ),
+        "auto_arima": Method(
+            "forecasters.arima:AutoArimaForecaster",
+            cost="heavy",
+            parallel=True,
+            library="statsmodels",
+        ),
+        "sarima": Method(
+            "forecasters.arima:SarimaForcaster",
+            cost="heavy",
+            memory="medium",
+            library="statsmodels",
+        ),
+    },
+)
+
+CLASSIFICATION = MethodRegistry(
+    "classification",
+    {
+        "decision_tree": Method(
+            "forecasters.classification:DecisionTreeClassifier",
+            library="sklearn",
+        ),
+        "naive_bayes": Method(
+            "forecasters.classification:NaiveBayesClassifier",
+            library="sklearn",
+        ),
+        "random_forest": Method(
+            "forecasters.classification:RandomForestClassifier",
+            cost="medium",
+            parallel=True,
+            memory="medium",
+            library="sklearn",
+        ),
+        "knn": Method(
+            "forecasters.classification:KNNClassifier",
+            cost="medium",
+            parallel=True,
+            memory="medium",
+            library="sklearn",
+        ),
+        # kernel matrix, quadratic in the rows
+        "svm": Method(
+            "forecasters.classification:SVMClassifier",
+            cost="heavy",
+            memory="large",
+            library="sklearn",
+        ),
+        "log_regression": Method(
+            "forecasters.classification:LogisticRegressionClassifier",
+            parallel=True,
+            library="sklearn",
+        ),
+        "sgd": Method(
+            "forecasters.classification:SGDIncrementalClassifier",
+            library="sklearn",
+        ),
+    },
+)
+
+CLUSTERING = MethodRegistry(
+    "clustering",
+    {
+        "kmeans": Method(
+            "forecasters.clustering:KMeansClustering",
+            cost="medium",
+            library="sklearn",
+        ),
+        # pairwise distances, quadratic in the rows
+        "hierarchical": Method(
+            "forecasters.clustering:HierarchicalClustering",
+            cost="heavy",
+            memory="large",
+            library="sklearn",
+        ),
+        "spectral": Method(
+            "forecasters.clustering:SpectralClustering",
+            cost="heavy",
+            parallel=True,
+            memory="large",
+            library="sklearn",
+        ),
+        "dbscan": Method(
+            "forecasters.clustering:DBSCANClustering",
+            cost="medium",
+            parallel=True,
+            memory="medium",
+            library="sklearn",
+        ),
+        "gaussian_mixture": Method(
+            "forecasters.clustering:GaussianMixtureClustering",
+            cost="medium",
+            library="sklearn",
+        ),
+        "minibatch_kmeans": Method(
+            "forecasters.clustering:MiniBatchKMeansClustering",
+            library="sklearn",
+        ),
+    },
+)
+
+SENTIMENT_ANALYSIS = MethodRegistry(
+    "sentiment_analysis",
+    {
+        "file": Method(
+            "forecasters.sentiment_analysis:SentimentClassifier",
+            cost="medium",
+            parallel=True,
+            memory="medium",
+            library="nltk",
+        ),
+        "text": Method(
+            "forecasters.sentiment_analysis:SentimentSplitter",
+            library="nltk",
+        ),
+    },
+)
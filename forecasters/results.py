@@ -0,0 +1,192 @@
+# Standard Library
+import gzip
+import tempfile
+
+# Third-Party Libraries
+from django.core.files.base import File
+
+RESULT_FORMATS = ("csv", "parquet")
+COMPRESSIONS = (None, "gzip", "zstd")
+SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class KeepOpen:
+    """A file proxy whose close() only flushes, for writers that close the
+    stream they write to."""
+
+    def __init__(self, file):
+        self.file = file
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    @property
+    def closed(self):
+        return False
+
+    def close(self):
+        self.file.flush()
+
+
+def compressed_stream(file, compression):
+    """A stream compressing what is written to it into ``file``, closing
+    the stream leaves ``file`` open."""
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=file, mode="wb")
+    if compression == "zstd":
+        # Third-Party Libraries
+        import pyarrow as pa
+
+        return pa.CompressedOutputStream(KeepOpen(file), "zstd")
+    raise ValueError(f"Unsupported compression {compression}")
+
+
+class ResultFile(File):
+    """A written result, with its Parquet copy when one was made."""
+
+    def __init__(self, file, name, columnar=None):
+        super().__init__(file, name)
+        self.columnar = columnar
+
+
+class ParquetSink:
+    """Append chunks of a frame to a Parquet file.
+
+    Streamed chunks are downcast one by one, the file takes float64 for
+    numeric columns, as a later chunk may hold fractions or missing values
+    where the first one has integers, and strings for columns the first
+    chunk has no values in, so every later chunk fits its schema.
+    """
+
+    def __init__(self, file, compression=None, row_group_size=None):
+        self.file = file
+        self.compression = compression or "snappy"
+        self.row_group_size = row_group_size
+        self.writer = None
+
+    @staticmethod
+    def widen(schema):
+        # Third-Party Libraries
+        import pyarrow as pa
+
+        fields = []
+        for field in schema:
+            if pa.types.is_integer(field.type) or pa.types.is_floating(
+                field.type
+            ):
+                field = field.with_type(pa.float64())
+            elif pa.types.is_null(field.type):
+                field = field.with_type(pa.string())
+            fields.append(field)
+        return pa.schema(fields)
+
+    def write(self, rows):
+        # Third-Party Libraries
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(rows, preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(
+                self.file,
+                self.widen(table.schema),
+                compression=self.compression,
+            )
+        self.writer.write_table(
+            table.cast(self.writer.schema), row_group_size=self.row_group_size
+        )
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class ResultWriter:
+    """Write a result to a temporary file chunk by chunk.
+
+    Only one chunk of ``chunksize`` rows is rendered in memory at a time,
+    the finished file is handed to the storage as a File and copied from
+    disk. CSV results are compressed as a whole with ``compression``,
+    Parquet results compress each column page with it. With ``columnar``
+    a CSV result also gets a Parquet copy in small row groups, which the
+    result preview reads a page at a time.
+    """
+
+    def __init__(
+        self,
+        name,
+        file_format="csv",
+        compression=None,
+        chunksize=100000,
+        columnar=False,
+    ):
+        if file_format not in RESULT_FORMATS:
+            raise ValueError(f"Unsupported result format {file_format}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression {compression}")
+        self.file_format = file_format
+        self.compression = compression
+        self.chunksize = chunksize
+        self.base_name = name
+        self.name = f"{name}.{file_format}"
+        if file_format == "csv":
+            self.name += SUFFIXES[compression]
+        self.file = tempfile.TemporaryFile()
+        self.stream = None
+        self.header = True
+        self.columnar = None
+        if columnar and file_format == "csv":
+            self.columnar = ParquetSink(
+                tempfile.TemporaryFile(), row_group_size=10000
+            )
+
+    def open_csv(self):
+        if self.compression is None:
+            return self.file
+        return compressed_stream(self.file, self.compression)
+
+    def write_csv(self, rows):
+        if self.stream is None:
+            self.stream = self.open_csv()
+        self.stream.write(
+            rows.to_csv(index=False, header=self.header).encode("utf-8")
+        )
+        self.header = False
+
+    def write_parquet(self, rows):
+        if self.stream is None:
+            self.stream = ParquetSink(self.file, self.compression)
+        self.stream.write(rows)
+
+    def write_columnar(self, rows):
+        try:
+            self.columnar.write(rows)
+        except (NotImplementedError, TypeError, ValueError):
+            # e.g. mixed types in a column, the result goes without a copy
+            self.columnar.close()
+            self.columnar.file.close()
+            self.columnar = None
+
+    def write(self, data):
+        # an empty result still gets its header
+        for start in range(0, len(data), self.chunksize) or [0]:
+            rows = data.iloc[start : start + self.chunksize]
+            if self.file_format == "parquet":
+                self.write_parquet(rows)
+            else:
+                self.write_csv(rows)
+            if self.columnar is not None:
+                self.write_columnar(rows)
+        return self
+
+    def close(self):
+        if self.stream is not None and self.stream is not self.file:
+            self.stream.close()
+        self.file.flush()
+        self.file.seek(0)
+        columnar = None
+        if self.columnar is not None:
+            self.columnar.close()
+            self.columnar.file.seek(0)
+            columnar = File(self.columnar.file, f"{self.base_name}.parquet")
+        return ResultFile(self.file, self.name, columnar)
@@ -1,10 +1,64 @@
+# Standard Library
+import time
+from functools import lru_cache
+
 # Third-Party Libraries
 import nltk
-from langdetect import detect
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from langdetect import DetectorFactory, detect
+from langdetect.lang_detect_exception import LangDetectException
 from nltk.corpus import stopwords
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
 from .base import BaseClassifier, BaseForecasterCreator
+from .methods import SENTIMENT_ANALYSIS
+
+# make langdetect deterministic across runs and worker processes
+DetectorFactory.seed = 0
+
+
+@lru_cache(maxsize=None)
+def get_analyzer():
+    return SentimentIntensityAnalyzer()
+
+
+@lru_cache(maxsize=100000)
+def word_polarity(word):
+    """Polarity of a single word, cached across tasks within a worker."""
+    return 1 if get_analyzer().polarity_scores(word)["compound"] >= 0 else 0
+
+
+def is_english(comment, language_filter="langdetect"):
+    if not isinstance(comment, str) or not comment:
+        return False
+    if language_filter == "none":
+        return True
+    if language_filter == "ascii":
+        # fast path: mostly-ASCII text is taken as English
+        return sum(char.isascii() for char in comment) >= 0.9 * len(comment)
+    try:
+        return detect(comment) == "en"
+    except LangDetectException:
+        return False
+
+
+def score_comments(comments, language_filter="langdetect"):
+    """English mask and VADER compound scores for a batch of comments."""
+    analyzer = get_analyzer()
+    mask = np.array(
+        [is_english(comment, language_filter) for comment in comments],
+        dtype=bool,
+    )
+    scores = np.array(
+        [
+            analyzer.polarity_scores(comment)["compound"] if keep else np.nan
+            for comment, keep in zip(comments, mask)
+        ],
+        dtype=float,
+    )
+    return mask, scores
 
 
 class SentimentClassifier(BaseClassifier):
@@ -12,35 +66,56 @@ class SentimentClassifier(BaseClassifier):
         if max_features := params.get("max_features", None):
             data = data.sample(max_features)
         super().__init__(data, params)
-        self.model = SentimentIntensityAnalyzer()
+        self.model = get_analyzer()
 
     def preprocess(self):
         pass
 
     def process(self):
-        target = self.params.get("target", None)
-        # drop no-english comments
-        for i, row in self.data.iterrows():
-            try:
-                if detect(row[target]) != "en":
-                    self.data.drop(i, inplace=True)
-            except Exception:
-                self.data.drop(i, inplace=True)
-
-        sentiments = (
-            self.data[self.target]
-            .apply(
-                lambda comment: 1
-                if self.model.polarity_scores(comment)["compound"] >= 0
-                else 0
+        start = time.perf_counter()
+        # each distinct comment is detected and scored once
+        codes, comments = pd.factorize(self.data[self.target])
+        comments = comments.tolist()
+        batch_size = self.params.get("batch_size", 5000)
+        language_filter = self.params.get("language_filter", "langdetect")
+        # batches are scored across a process pool, the frame itself is
+        # filtered once with the combined mask
+        results = Parallel(n_jobs=self.n_jobs or 1)(
+            delayed(score_comments)(
+                comments[i : i + batch_size], language_filter
             )
-            .tolist()
+            for i in range(0, len(comments), batch_size)
         )
-        self.data["sentiment"] = sentiments
+        unique_mask = np.concatenate([r[0] for r in results] + [[False]])
+        unique_scores = np.concatenate([r[1] for r in results] + [[np.nan]])
+        # missing comments are coded -1 and pick the trailing False/NaN
+        mask = unique_mask[codes].astype(bool)
+        scores = unique_scores[codes]
+        self.data = self.data[mask].copy()
+        self.data["sentiment"] = (scores[mask] >= 0).astype(int)
+        seconds = time.perf_counter() - start
+        self.throughput = {
+            "rows": len(codes),
+            "unique": len(comments),
+            "kept": int(mask.sum()),
+            "seconds": seconds,
+            "rows_per_second": len(codes) / seconds if seconds else None,
+        }
+
+    def summary(self):
+        counts = self.data["sentiment"].value_counts()
+        return {
+            "positive": int(counts.get(1, 0)),
+            "negative": int(counts.get(0, 0)),
+        }
 
     def package_results(self):
         return {
-            "result": {"model": "vader", "success": True},
+            "result": {
+                "model": "vader",
+                "throughput": self.throughput,
+                "success": True,
+            },
             "file": self.generate_result_file(),
         }
 
@@ -48,39 +123,30 @@ class SentimentClassifier(BaseClassifier):
 class SentimentSplitter(BaseClassifier):
     def __init__(self, data, params):
         super().__init__(data, params)
-        self.model = SentimentIntensityAnalyzer()
+        self.model = get_analyzer()
         self.customer_stop_words = params.get("customer_stop_words", None)
         self.stop_words = set(stopwords.words("english"))
+        if self.customer_stop_words:
+            self.stop_words.update(self.customer_stop_words)
         self.words = None
 
     def preprocess(self):
-        words = [word.lower() for word in nltk.word_tokenize(self.data)]
-        words = [
+        # repeated words are collapsed before filtering and scoring
+        words = dict.fromkeys(
+            word.lower() for word in nltk.word_tokenize(self.data)
+        )
+        self.words = [
             word
             for word in words
             if word not in self.stop_words and word.isalpha() and len(word) > 2
         ]
-        if self.customer_stop_words:
-            words = [
-                word for word in words if word not in self.customer_stop_words
-            ]
-        self.words = words
 
     def process(self):
-        self.preprocess()
-        self.result = {}
-        for word in self.words:
-            if self.model.polarity_scores(word)["compound"] >= 0:
-                self.result[word] = 1
-            else:
-                self.result[word] = 0
+        self.result = {word: word_polarity(word) for word in self.words}
 
     def package_results(self):
         return {"result": self.result}
 
 
 class SentimentAnalyzerCreator(BaseForecasterCreator):
-    forecaster_classes = {
-        "file": SentimentClassifier,
-        "text": SentimentSplitter,
-    }
+    methods = SENTIMENT_ANALYSIS
@@ -0,0 +1,100 @@
+# Third-Party Libraries
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error
+from statsmodels.tsa.holtwinters import (
+    ExponentialSmoothing,
+    Holt,
+    SimpleExpSmoothing,
+)
+
+from .time_series import BaseTimeSeriesForecaster
+from .vectorized import INITIALIZATION_METHODS, SmoothingFit
+
+
+class SimpleExponentialSmoothingForecaster(BaseTimeSeriesForecaster):
+    def __init__(self, data, params):
+        super().__init__(data, params)
+
+    def is_fixed(self):
+        """Fixed smoothing parameters are a plain recurrence, no statsmodels
+        model is needed."""
+        initialization = self.params.get("initialization_method", "estimated")
+        return not self.params.get("optimazed", False) and (
+            initialization in INITIALIZATION_METHODS
+        )
+
+    def fit_fixed(self, beta=None):
+        self.model = SmoothingFit.fit(
+            self.y_train,
+            self.params.get("alpha", 0.2),
+            beta,
+            method=self.params.get("initialization_method", "estimated"),
+            initial_level=self.params.get("initial_level", None),
+            initial_trend=self.params.get("initial_trend", None),
+        )
+
+    def fit(self):
+        if self.is_fixed():
+            return self.fit_fixed()
+        alpha = self.params.get("alpha", 0.2)
+        optimazed = self.params.get("optimazed", False)
+        initialization_method = self.params.get(
+            "initialization_method", "estimated"
+        )
+        self.model = SimpleExpSmoothing(
+            self.y_train, initialization_method=initialization_method
+        ).fit(optimized=optimazed, smoothing_level=alpha)
+
+    def predict(self):
+        self.y_pred = self.model.forecast(len(self.y_test))
+        self.data["pred"] = np.nan
+        self.data.loc[self.y_test.index, "pred"] = self.y_pred
+        predays = self.params.get("predays", 30)
+        self.future_pred = self.model.forecast(len(self.y_test) + predays)
+        self.data = self.data.append(
+            pd.DataFrame({"pred": self.future_pred[-predays:]})
+        )
+
+    def evaluate(self):
+        self.score = np.sqrt(mean_squared_error(self.y_test, self.y_pred))
+
+    def package_results(self):
+        return {
+            "result": {
+                "model": "SimpleExponentialSmoothing",
+                "score": self.score,
+            },
+            "file": self.generate_result_file(),
+        }
+
+
+class HoltForecaster(SimpleExponentialSmoothingForecaster):
+    def __init__(self, data, params):
+        super().__init__(data, params)
+
+    def fit(self):
+        if self.is_fixed():
+            return self.fit_fixed(beta=self.params.get("beta", 0.2))
+        alpha = self.params.get("alpha", 0.2)
+        beta = self.params.get("beta", 0.2)
+        optimazed = self.params.get("optimazed", False)
+        initialization_method = self.params.get(
+            "initialization_method", "estimated"
+        )
+        self.model = Holt(
+            self.y_train, initialization_method=initialization_method
+        ).fit(optimized=optimazed, smoothing_level=alpha, smoothing_slope=beta)
+
+
+class HoltWintersSeasonalForecaster(SimpleExponentialSmoothingForecaster):
+    def fit(self):
+        # add, mul, additive, multiplicative, None
+        add_trend = self.params.get("add_trend", "add")
+        add_seasonality = self.params.get("add_seasonality", "add")
+        self.model = ExponentialSmoothing(
+            self.y_train,
+            trend=add_trend,
+            seasonal=add_seasonality,
+            seasonal_periods=self.window,
+        ).fit()
@@ -0,0 +1,150 @@
+# Standard Library
+import math
+
+# Third-Party Libraries
+import numpy as np
+import pandas as pd
+
+# Aggregates stored with a result, so dashboards can read them from the
+# result endpoint instead of downloading the result file. Everything
+# returned is plain JSON: lists, str keys, floats with NaN as None.
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def number(value):
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def plain(value):
+    """A numpy scalar label as the Python value it holds."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def sort_labels(labels):
+    try:
+        return sorted(labels)
+    except TypeError:
+        # mixed label types keep their order of appearance
+        return list(labels)
+
+
+def distribution(values):
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    return {
+        "count": len(values),
+        "mean": number(values.mean()),
+        "std": number(values.std()),
+        "min": number(values.min()),
+        "max": number(values.max()),
+        "quantiles": {
+            str(q): number(value)
+            for q, value in zip(QUANTILES, np.quantile(values, QUANTILES))
+        },
+    }
+
+
+def forecast_summary(actual, predicted):
+    """The distribution of the predictions past the observed values, and of
+    the residuals wherever both are known."""
+    actual = np.asarray(actual, dtype=float)
+    predicted = np.asarray(predicted, dtype=float)
+    known = ~np.isnan(actual) & ~np.isnan(predicted)
+    future = np.isnan(actual) & ~np.isnan(predicted)
+    residuals = actual[known] - predicted[known]
+    summary = {
+        "forecast": distribution(predicted[future]),
+        "residuals": distribution(residuals),
+    }
+    if summary["residuals"] is not None:
+        summary["residuals"]["mae"] = number(np.abs(residuals).mean())
+        summary["residuals"]["rmse"] = number(np.sqrt((residuals**2).mean()))
+    return summary
+
+
+class ConfusionMatrix:
+    """Confusion counts of actual (rows) against predicted (columns)
+    labels, accumulated batch by batch."""
+
+    def __init__(self):
+        self.counts = None
+
+    def update(self, actual, predicted):
+        counts = pd.crosstab(
+            pd.Series(np.asarray(actual), name="actual"),
+            pd.Series(np.asarray(predicted), name="predicted"),
+        )
+        if self.counts is None:
+            self.counts = counts
+        else:
+            self.counts = self.counts.add(counts, fill_value=0)
+        return self
+
+    def summary(self):
+        if self.counts is None:
+            return None
+        labels = sort_labels(self.counts.index.union(self.counts.columns))
+        matrix = (
+            self.counts.reindex(index=labels, columns=labels, fill_value=0)
+            .fillna(0)
+            .to_numpy(dtype=int)
+        )
+        hits = np.diag(matrix)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            precision = hits / matrix.sum(axis=0)
+            recall = hits / matrix.sum(axis=1)
+        return {
+            "labels": [plain(label) for label in labels],
+            "confusion_matrix": matrix.tolist(),
+            "per_class": [
+                {
+                    "label": plain(label),
+                    "precision": number(precision[i]),
+                    "recall": number(recall[i]),
+                    "support": int(matrix[i].sum()),
+                }
+                for i, label in enumerate(labels)
+            ],
+        }
+
+
+class ClusterProfile:
+    """Size and centroid (mean of the features) of each cluster,
+    accumulated batch by batch."""
+
+    def __init__(self, features):
+        self.features = list(features)
+        self.sizes = None
+        self.sums = None
+
+    def update(self, data, labels):
+        grouped = data[self.features].groupby(np.asarray(labels))
+        sizes, sums = grouped.size(), grouped.sum()
+        if self.sizes is None:
+            self.sizes, self.sums = sizes, sums
+        else:
+            self.sizes = self.sizes.add(sizes, fill_value=0)
+            self.sums = self.sums.add(sums, fill_value=0)
+        return self
+
+    def summary(self):
+        if self.sizes is None:
+            return None
+        centroids = self.sums.div(self.sizes, axis=0)
+        return {
+            "clusters": [
+                {
+                    "cluster": plain(label),
+                    "size": int(self.sizes[label]),
+                    "centroid": {
+                        str(feature): number(centroids.at[label, feature])
+                        for feature in self.features
+                    },
+                }
+                for label in sort_labels(self.sizes.index)
+            ]
+        }
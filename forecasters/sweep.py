@@ -0,0 +1,211 @@
+# Standard Library
+import copy
+import itertools
+import math
+
+# Third-Party Libraries
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from .base import CPUBudgetMixin, Mixin
+
+
+def grid_candidates(grid):
+    keys = list(grid)
+    return [
+        dict(zip(keys, values))
+        for values in itertools.product(*(grid[key] for key in keys))
+    ]
+
+
+def sample_value(spec, rng):
+    """Draw one value from a list of choices or a {"low", "high"} range,
+    optionally sampled on a ``log`` scale and rounded to an ``integer``."""
+    if isinstance(spec, list):
+        return spec[rng.integers(len(spec))]
+    low, high = spec["low"], spec["high"]
+    if spec.get("log", False):
+        value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+    else:
+        value = float(rng.uniform(low, high))
+    return int(round(value)) if spec.get("integer", False) else value
+
+
+def random_candidates(distributions, n_iter, random_state=None):
+    rng = np.random.default_rng(random_state)
+    return [
+        {key: sample_value(spec, rng) for key, spec in distributions.items()}
+        for _ in range(n_iter)
+    ]
+
+
+def fit_candidate(forecaster_class, split, params, fraction):
+    """Fit one candidate on the shared split and return its objective."""
+    forecaster = forecaster_class(split["data"], params)
+    for key, value in split.items():
+        setattr(forecaster, key, copy.copy(value))
+    try:
+        if fraction < 1:
+            forecaster.subsample(fraction)
+        forecaster.fit()
+        forecaster.predict()
+        forecaster.evaluate()
+        score = float(forecaster.objective())
+    except (ArithmeticError, LookupError, TypeError, ValueError) as e:
+        return {"score": None, "error": str(e)}
+    return {"score": None if math.isnan(score) else score, "error": None}
+
+
+class SweepForecaster(Mixin, CPUBudgetMixin):
+    """Hyperparameter search over one method.
+
+    The data is split once and every candidate is fitted on that split,
+    fanned out across ``n_jobs`` processes. Candidates come from a ``grid``
+    or are drawn from ``distributions``. With ``halving`` the candidates
+    are first fitted on a fraction of the training rows and only the best
+    ``1 / factor`` move on to the next, larger, rung. A rung stops early
+    once ``patience`` candidates in a row have not improved on its best
+    score. The result is a leaderboard, best candidate first.
+    """
+
+    def __init__(self, forecaster_class, data, params):
+        self.forecaster_class = forecaster_class
+        self.data = data
+        self.params = params
+        self.sweep = params["sweep"]
+        self.leaderboard = []
+
+    def base_params(self, candidate=None):
+        params = copy.deepcopy(self.params)
+        params.pop("sweep")
+        params.update(candidate or {})
+        # the sweep owns the cores, each fit runs on one
+        params["n_jobs"] = 1
+        return params
+
+    def candidates(self):
+        if grid := self.sweep.get("grid", None):
+            return grid_candidates(grid)
+        return random_candidates(
+            self.sweep["distributions"],
+            self.sweep.get("n_iter", 10),
+            self.sweep.get("random_state", None),
+        )
+
+    def split_data(self):
+        prototype = self.forecaster_class(self.data, self.base_params())
+        before = dict(vars(prototype))
+        prototype.split_data()
+        # everything split_data set or replaced is shared by all candidates
+        self.split = {
+            key: value
+            for key, value in vars(prototype).items()
+            if key == "data" or before.get(key, None) is not value
+        }
+
+    def rungs(self, n_candidates):
+        if not self.sweep.get("halving", False):
+            return [1.0]
+        factor = self.sweep.get("factor", 3)
+        n_rungs = int(math.log(max(n_candidates, 1), factor)) + 1
+        return [factor ** (rung - n_rungs + 1) for rung in range(n_rungs)]
+
+    def run_rung(self, candidates, fraction, parallel):
+        patience = self.sweep.get("patience", None)
+        batch_size = self.n_workers
+        results, best, stale = [], None, 0
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start : start + batch_size]
+            scores = parallel(
+                delayed(fit_candidate)(
+                    self.forecaster_class,
+                    self.split,
+                    self.base_params(candidate),
+                    fraction,
+                )
+                for candidate in batch
+            )
+            for candidate, score in zip(batch, scores):
+                results.append({"params": candidate, **score})
+                if score["score"] is not None and (
+                    best is None or score["score"] > best
+                ):
+                    best, stale = score["score"], 0
+                else:
+                    stale += 1
+            if patience and stale >= patience:
+                break
+        return results
+
+    def fit(self):
+        candidates = self.candidates()
+        factor = self.sweep.get("factor", 3)
+        with Parallel(n_jobs=self.n_workers) as parallel:
+            for rung, fraction in enumerate(self.rungs(len(candidates))):
+                results = self.run_rung(candidates, fraction, parallel)
+                for result in results:
+                    result.update({"rung": rung, "fraction": fraction})
+                self.leaderboard.extend(results)
+                ranked = sorted(
+                    (r for r in results if r["score"] is not None),
+                    key=lambda r: r["score"],
+                    reverse=True,
+                )
+                keep = max(1, math.ceil(len(candidates) / factor))
+                candidates = [r["params"] for r in ranked[:keep]]
+                if not candidates:
+                    break
+
+    def package_results(self):
+        ranked = sorted(
+            self.leaderboard,
+            key=lambda r: (
+                r["fraction"],
+                r["score"] is not None,
+                r["score"] or 0,
+            ),
+            reverse=True,
+        )
+        self.data = pd.DataFrame(
+            [
+                {
+                    **r["params"],
+                    "score": r["score"],
+                    "rung": r["rung"],
+                    "fraction": r["fraction"],
+                    "error": r["error"],
+                }
+                for r in ranked
+            ]
+        )
+        best = ranked[0] if ranked and ranked[0]["score"] is not None else None
+        return {
+            "result": {
+                "model": "Sweep",
+                "method": self.forecaster_class.__name__,
+                "best_params": best["params"] if best else None,
+                "best_score": best["score"] if best else None,
+                "evaluated": len(self.leaderboard),
+                "leaderboard": ranked[:10],
+                "success": best is not None,
+            },
+            "file": self.generate_result_file(),
+        }
+
+    def forecast(self):
+        with self.thread_limits():
+            self.split_data()
+            self.fit()
+            return self.package_results()
+
+
+class SweepCreatorMixin:
+    """Creates a SweepForecaster when the params carry a ``sweep``."""
+
+    def create(self):
+        if self.params.get("sweep", None):
+            return SweepForecaster(
+                self.forecaster_class(self.method), self.data, self.params
+            )
+        return super().create()
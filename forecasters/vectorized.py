@@ -0,0 +1,168 @@
+# Third-Party Libraries
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Many series at once: every function takes a 2-D (series x time) array,
+# series of different lengths are left aligned and padded with NaN.
+
+
+def stack(values, codes, positions, n_series, length):
+    """Scatter a long column into a (series x time) array."""
+    matrix = np.full((n_series, length), np.nan)
+    matrix[codes, positions] = values
+    return matrix
+
+
+def rolling_mean(matrix, window):
+    """``Series.rolling(window).mean()`` along each row."""
+    out = np.full(matrix.shape, np.nan)
+    if 0 < window <= matrix.shape[1]:
+        out[:, window - 1 :] = sliding_window_view(
+            matrix, window, axis=1
+        ).mean(axis=-1)
+    return out
+
+
+def row_corr(x, y):
+    """Pearson correlation of each row pair, ignoring NaN pairs."""
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n = mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(mask, x, 0).sum(axis=1) / n
+        y_mean = np.where(mask, y, 0).sum(axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0)
+        dy = np.where(mask, y - y_mean[:, None], 0)
+        corr = (dx * dy).sum(axis=1) / np.sqrt(
+            (dx**2).sum(axis=1) * (dy**2).sum(axis=1)
+        )
+    return np.where(n > 1, corr, np.nan)
+
+
+def linear_trend(matrix, lengths, rate, predays):
+    """Least-squares line over the time step of each row.
+
+    The last ``ceil(rate * n)`` steps of a row are held out like an
+    unshuffled ``train_test_split``. Returns the fitted values on the test
+    steps (NaN elsewhere), the R² on the test steps and the next
+    ``predays`` steps after each row.
+    """
+    steps = np.arange(matrix.shape[1])[None, :]
+    n_train = lengths - np.ceil(rate * lengths).astype(int)
+    train = steps < n_train[:, None]
+    test = ~train & (steps < lengths[:, None])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_mean = (steps * train).sum(axis=1) / n_train
+        y_mean = np.where(train, matrix, 0).sum(axis=1) / n_train
+        dt = np.where(train, steps - t_mean[:, None], 0)
+        dy = np.where(train, matrix - y_mean[:, None], 0)
+        slope = (dt * dy).sum(axis=1) / (dt**2).sum(axis=1)
+        intercept = y_mean - slope * t_mean
+        fitted = intercept[:, None] + slope[:, None] * steps
+        y_test = np.where(test, matrix, 0)
+        test_mean = y_test.sum(axis=1) / test.sum(axis=1)
+        ss_res = np.where(test, (matrix - fitted) ** 2, 0).sum(axis=1)
+        ss_tot = np.where(test, (matrix - test_mean[:, None]) ** 2, 0).sum(
+            axis=1
+        )
+        score = 1 - ss_res / ss_tot
+    future_steps = lengths[:, None] + np.arange(predays)[None, :]
+    future = intercept[:, None] + slope[:, None] * future_steps
+    return np.where(test, fitted, np.nan), score, future
+
+
+# How statsmodels' Holt-Winters models initialize a non-seasonal series,
+# "estimated" falls back to the simple method below ten observations and
+# is not re-estimated when the smoothing parameters are fixed.
+INITIALIZATION_METHODS = (
+    "estimated",
+    "heuristic",
+    "legacy-heuristic",
+    "known",
+)
+
+
+def initial_states(
+    matrix, lengths, method="estimated", initial_level=None, initial_trend=None
+):
+    """Initial level and additive trend of each row, NaN where ``method``
+    cannot initialize the row."""
+    if method not in INITIALIZATION_METHODS:
+        raise ValueError(f"Unsupported initialization method {method}")
+    n_series = len(matrix)
+    if method == "known":
+        level = np.full(n_series, float(initial_level))
+        trend = np.full(n_series, float(initial_trend or 0))
+        return level, trend
+    # first observation and first difference
+    level = matrix[:, 0].copy()
+    trend = (
+        matrix[:, 1] - matrix[:, 0]
+        if matrix.shape[1] > 1
+        else np.full(n_series, np.nan)
+    )
+    if method == "legacy-heuristic":
+        return level, trend
+    # least-squares line through the first ten observations, x = 1..10
+    heuristic = lengths >= 10
+    if matrix.shape[1] >= 10:
+        head = matrix[:, :10]
+        x = np.arange(1, 11) - 5.5
+        slope = (head * x).sum(axis=1) / (x**2).sum()
+        intercept = head.mean(axis=1) - slope * 5.5
+        level = np.where(heuristic, intercept, level)
+        trend = np.where(heuristic, slope, trend)
+    if method == "heuristic":
+        level = np.where(heuristic, level, np.nan)
+        trend = np.where(heuristic, trend, np.nan)
+    return level, trend
+
+
+def exponential_smoothing(matrix, lengths, alpha, beta, level, trend):
+    """Final level and trend of each row after simple (``beta`` None) or
+    Holt's additive trend exponential smoothing.
+
+    Loops over time only, every step updates all series at once, steps past
+    the end of a row leave its state unchanged.
+    """
+    level = level.astype(float)
+    trend = np.zeros_like(level) if beta is None else trend.astype(float)
+    for step in range(matrix.shape[1]):
+        active = step < lengths
+        new_level = alpha * matrix[:, step] + (1 - alpha) * (level + trend)
+        if beta is not None:
+            new_trend = beta * (new_level - level) + (1 - beta) * trend
+            trend = np.where(active, new_trend, trend)
+        level = np.where(active, new_level, level)
+    return level, trend
+
+
+def smoothing_forecast(level, trend, steps):
+    """The next ``steps`` values after each row's final state."""
+    return level[:, None] + trend[:, None] * np.arange(1, steps + 1)[None, :]
+
+
+class SmoothingFit:
+    """Fixed-parameter smoothing of a single series, forecasting like a
+    statsmodels results object."""
+
+    def __init__(self, level, trend):
+        self.level = level
+        self.trend = trend
+
+    @classmethod
+    def fit(cls, values, alpha, beta=None, method="estimated", **initial):
+        matrix = np.asarray(values, dtype=float)[None, :]
+        lengths = np.array([matrix.shape[1]])
+        level, trend = initial_states(matrix, lengths, method, **initial)
+        if np.isnan(level).any() or (
+            beta is not None and np.isnan(trend).any()
+        ):
+            raise ValueError(
+                f"Cannot initialize {lengths[0]} observations with {method}"
+            )
+        return cls(
+            *exponential_smoothing(matrix, lengths, alpha, beta, level, trend)
+        )
+
+    def forecast(self, steps):
+        return smoothing_forecast(self.level, self.trend, steps)[0]
@@ -16,6 +16,14 @@ class Attachment(models.Model):
         User, on_delete=models.CASCADE, related_name="attachments", default=1
     )
     file_format = models.CharField(max_length=20, default="csv")
+    # filled in by the ingest stage after upload
+    digest = models.CharField(
+        max_length=64, null=True, blank=True, default=None
+    )
+    schema = models.JSONField(default=dict)
+    columnar_file = models.FileField(
+        upload_to="attachments/columnar", null=True, blank=True, default=None
+    )
     size = property(lambda self: self.file.size)
     url = property(lambda self: self.file.url)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -48,6 +56,22 @@ class Result(models.Model):
     file = models.FileField(
         upload_to="results/", null=True, blank=True, default=None
     )
+    # Parquet copy of a csv result, read a page at a time by the preview
+    columnar_file = models.FileField(
+        upload_to="results/columnar", null=True, blank=True, default=None
+    )
+    # the fitted estimator and its preprocessing, see FittedModel
+    model_file = models.FileField(
+        upload_to="models/", null=True, blank=True, default=None
+    )
+    # attachment digest + canonical params, see apps.apis.cache
+    cache_key = models.CharField(
+        max_length=64, null=True, blank=True, default=None, db_index=True
+    )
+    # sha256 of the result file, the ETag of its downloads
+    digest = models.CharField(
+        max_length=64, null=True, blank=True, default=None
+    )
 
     def __str__(self):
         return self.result
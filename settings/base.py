@@ -151,6 +151,13 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Stream every upload to a temporary file on disk in chunks instead of
+# buffering it in memory
+# https://docs.djangoproject.com/en/3.2/ref/settings/#file-upload-handlers
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
 LOOGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -174,6 +181,20 @@ LOOGING = {
     },
 }
 
+# Tasks are routed to the fast, heavy and dl queues by apps/apis/routing.py,
+# celery_main.py consumes the queues listed in CELERY_QUEUES
+CELERY_TASK_DEFAULT_QUEUE = "fast"
+CELERY_TASK_ROUTES = {
+    # parses the whole attachment
+    "apps.apis.tasks.ingest_attachment": {"queue": "heavy"},
+    # hashes every result file without a digest
+    "apps.apis.tasks.backfill_digests": {"queue": "heavy"},
+}
+# tasks each worker process reserves ahead of the one it runs
+CELERY_WORKER_PREFETCH_MULTIPLIER = env.int(
+    "CELERY_PREFETCH_MULTIPLIER", default=1
+)
+
 
 class RabbitMQConfig:
     host = env("RABBITMQ_HOST")